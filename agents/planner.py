@@ -5,9 +5,14 @@ from __future__ import annotations
 Output key: "plan_json"
 """
 
+import re
 from typing import Dict, List, Optional
 
 
+# y', y'' but not the apostrophe in "What's" or "I'm"
+_PRIMED = re.compile(r"\b(?!I')[A-Za-z]'")
+
+
 class PlannerAgent:
     model: str = "gemini-2.0-flash"
 
@@ -23,6 +28,10 @@ class PlannerAgent:
             steps.append({"step": "Compute integral", "tool": "calculus.integrate"})
             expected_theorems.append("Fundamental Theorem of Calculus")
             verification_items.append("Differentiate result to recover integrand")
+        if _PRIMED.search(text) or "differential equation" in t:
+            steps.append({"step": "Solve ODE", "tool": "ode.solve_ode"})
+            expected_theorems.append("Existence and uniqueness (Picard-Lindelof)")
+            verification_items.append("checkodesol and initial conditions")
         if "solve" in t or "=" in t:
             steps.append({"step": "Solve equation", "tool": "equation.solve_equation"})
             expected_theorems.append("Quadratic formula (if polynomial)")
@@ -4,28 +4,125 @@ from __future__ import annotations
 MathSolverAgent: symbolic-first solver using tools and SymPy with safe fallbacks.
 
 Input: natural language math problem
-Output state key: "solver_output" (dict with derivation_steps, final_answer)
+Output state key: "solver_output" (dict with derivation_steps, final_answer,
+final_latex, route, problem, source, parse_cache_hit)
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 import re
 
-from sympy import Eq, Symbol, oo, limit as sympy_limit
-from sympy import sympify
-from sympy import integrate as sympy_integrate
-from sympy import solve as sympy_solve
+from sympy import Derivative, Eq, Equality, Expr, Integral, Limit, Subs, Symbol
+from sympy import limit as sympy_limit, series as sympy_series
+from sympy.core.function import AppliedUndef
 from sympy.printing.latex import latex as sympy_latex
 
 from tools.algebra import simplify_expr
-from tools.calculus import differentiate, integrate
+from tools.calculus import integrate
 from tools.equation import solve_equation
-from tools.numeric import evaluate
-from tools.latex import pretty as latex_pretty
+from tools.latex import remember
+from tools.ode import ode_function, solve_ode
+from tools.parser import ParseError, extract, extract_all
+from tools.parser import cache_info as parser_cache_info
+from tools.result_table import ResultTable, answer_latex, default_table
 
 
-def _norm(s: str) -> str:
-    return s.replace("^", "**")
+@dataclass
+class Problem:
+    """A parsed problem: `kind` is one of tools.result_table.KINDS."""
+
+    kind: str
+    expr: object
+    var: Optional[Symbol] = None
+    args: Tuple[object, ...] = ()
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "kind": self.kind,
+            "expr": str(self.expr),
+            "var": "" if self.var is None else str(self.var),
+            "args": [str(a) for a in self.args],
+        }
+
+
+_FOR_VAR = re.compile(r"\s+for\s+([A-Za-z][A-Za-z0-9_]*)\s*[.?]?\s*$", re.IGNORECASE)
+_PRIMED = re.compile(r"\b(?!I')([A-Za-z])'")  # y'' but not "What's" or "I'm"
+
+
+def _parse_ode(text: str) -> Optional[Problem]:
+    """y'' - y = 0 with y(0)=1, y'(0)=0 -> Problem("ode", Eq, x, (initial conditions...))."""
+    m = _PRIMED.search(text)
+    dep = m.group(1) if m else "y"
+    indep = "t" if dep == "x" or re.search(r"\b%s\(t\)" % dep, text) else "x"
+    try:
+        nodes = extract_all(text, indep=indep)
+    except (ParseError, TypeError, ValueError):
+        return None
+    equation = None
+    conditions = []
+    for node in nodes:
+        has_derivative = any(isinstance(d.expr, AppliedUndef) for d in node.atoms(Derivative))
+        if equation is None and has_derivative and not node.atoms(Subs):
+            equation = node if isinstance(node, Equality) else Eq(node, 0)
+        elif isinstance(node, Equality) and isinstance(node.lhs, (AppliedUndef, Subs)) and not node.lhs.free_symbols:
+            conditions.append(node)  # y(0)=1, y'(0)=0
+    if equation is None:
+        return None
+    f = ode_function(equation)
+    if f is not None:
+        # a bare y next to y'' means y(x)
+        equation = equation.xreplace({Symbol(f.func.__name__): f})
+    return Problem("ode", equation, Symbol(indep), tuple(conditions))
+
+
+def parse_problem(text: str) -> Optional[Problem]:
+    """Classify the math in `text` into a Problem; None when nothing parses."""
+    t = text.strip()
+
+    # 0) Differential equations: y'' - y = 0, diff(y(x), x) = y(x)
+    if _PRIMED.search(t) or re.search(r"\bdiff\s*\(\s*[A-Za-z]\(", t):
+        problem = _parse_ode(t)
+        if problem is not None:
+            return problem
+    # Optional trailing 'for <var>' names the unknown
+    m = _FOR_VAR.search(t)
+    unknown = Symbol(m.group(1)) if m else None
+    if m:
+        t = t[: m.start()]
+    try:
+        node = extract(t, strict=True)
+    except (ParseError, TypeError, ValueError):
+        return None
+
+    # 1) Integrals: ∫_0^1 x^2 dx, integrate(x**2, x, (x, 0, 1))
+    if isinstance(node, Integral) and len(node.limits) == 1:
+        lim = node.limits[0]
+        return Problem("integral", node.function, lim[0], tuple(lim[1:]))
+
+    # 2) Limits: limit((1+1/n)**n, n, oo), lim_{x→0} sin(x)/x
+    # One-sided limits keep their direction ("-" or "+-"); SymPy's default "+",
+    # and the implied side of a limit at ±oo, are left out.
+    if isinstance(node, Limit):
+        expr, var, point, direction = node.args
+        one_sided = str(direction) != "+" and point.is_finite is not False
+        return Problem("limit", expr, var, (point, str(direction)) if one_sided else (point,))
+
+    # 3) series(sin(x), x, 0, 6)
+    if isinstance(node, AppliedUndef) and node.func.__name__ == "series" and len(node.args) >= 2:
+        return Problem("series", node.args[0], node.args[1], tuple(node.args[2:]))
+
+    # 4) Equations: Solve x^2 - 5x + 6 = 0 -> {2,3}
+    is_solve = t.lower().startswith("solve ")
+    if isinstance(node, Equality) or (is_solve and isinstance(node, Expr)):
+        expr = node.lhs - node.rhs if isinstance(node, Equality) else node
+        symbols = sorted(expr.free_symbols, key=lambda s: s.name)
+        var = unknown or (symbols[0] if symbols else Symbol("x"))
+        return Problem("solve", expr, var)
+
+    # Fallback: simplify the expression
+    if isinstance(node, Expr):
+        return Problem("simplify", node)
+    return None
 
 
 @dataclass
@@ -37,118 +134,119 @@ class MathSolverAgent:
     When ADK is available, this agent can be adapted to inherit from
     google.adk.agents.LlmAgent and register tools. For tests and offline use,
     this class exposes a simple run(text: str, state: dict) method.
+
+    Known results (tools.result_table) are consulted before solving.
     """
 
     model: str = "gemini-2.0-flash"
+    result_table: Optional[ResultTable] = field(default=None, repr=False)
+    use_result_table: bool = True
+    ode_timeout: float = 5.0
+
+    def _table(self) -> Optional[ResultTable]:
+        if not self.use_result_table:
+            return None
+        return self.result_table if self.result_table is not None else default_table()
 
     def run(self, text: str, state: Optional[Dict[str, object]] = None) -> Dict[str, object]:
         state = {} if state is None else dict(state)
         derivation_steps: List[str] = []
         final_answer: str = ""
+        final_latex: str = ""
+        source = "computed"
+        checks: List[Dict[str, object]] = []
+
+        # Approximate under threads: another request may miss in between.
+        misses = parser_cache_info().misses
+        problem = parse_problem(text)
+        parse_cache_hit = parser_cache_info().misses == misses
+        table = self._table()
+        hit = None
+        if problem is not None and table is not None:
+            hit = table.lookup(problem.kind, problem.expr, problem.var, problem.args)
+        if hit is not None:
+            shown = answer_latex(hit.result)
+            derivation_steps.append(r"\text{Known result (%s)}: %s" % (hit.kind, shown))
+            final_answer, final_latex = hit.result, shown
+            source = "table"
+        elif problem is not None:
+            derivation_steps, final_answer, final_latex, checks = self._solve(problem, text.strip())
+        remember(final_answer, final_latex)
+
+        if not final_answer and not derivation_steps:
+            derivation_steps.append(r"\text{Unable to parse problem}")
 
-        # Heuristic routing
-        routed = False
-        t = text.strip()
-
-        # 1) Definite integral like ∫_0^1 x^2 dx
-        m = re.search(r"∫_\s*([^\{^\s]+)\^\s*([^\s]+)\s+([^d]+)d([a-zA-Z])", t)
-        if m:
-            a_str, b_str, f_str, var = m.groups()
-            a = sympify(_norm(a_str))
-            b = sympify(_norm(b_str))
-            expr = _norm(f_str.strip())
-            tool_res = integrate(expr, var, (var, a, b))
-            if tool_res.get("status") == "ok":
-                derivation_steps.append(r"\\int_{%s}^{%s} %s \, d%s = %s" % (
-                    sympy_latex(a), sympy_latex(b), sympy_latex(sympify(expr)), var, tool_res["latex"]
-                ))
-                final_answer = tool_res["result_str"]
-                routed = True
+        state["solver_output"] = {
+            "derivation_steps": derivation_steps,
+            "final_answer": final_answer,
+            "final_latex": final_latex,
+            "route": problem.kind if problem is not None else "",
+            "problem": problem.as_dict() if problem is not None else None,
+            "source": source,
+            "parse_cache_hit": parse_cache_hit,
+            "checks": checks,
+        }
+        return state
 
-        # 2) Explicit integrate(...) form
-        if not routed and t.lower().startswith("integrate("):
-            # Expect integrate("x**2", "x", ("x",0,1)) minimal parsing
-            try:
-                # Unsafe to eval; parse minimally
-                inner = t[len("integrate(") : -1]
-                parts = [p.strip() for p in inner.split(",")]
-                expr = parts[0].strip().strip("'\"")
-                var = parts[1].strip().strip("'\"")
-                if len(parts) >= 3:
-                    lim = parts[2:5]
-                    lim_var = lim[0].strip().strip("() '")
-                    a = sympify(lim[1])
-                    b = sympify(lim[2].rstrip(")"))
-                    tool_res = integrate(expr, var, (lim_var, a, b))
+    def _solve(self, problem: Problem, text: str) -> Tuple[List[str], str, str, List[Dict[str, object]]]:
+        steps: List[str] = []
+        kind, expr, var = problem.kind, problem.expr, problem.var
+
+        if kind == "integral":
+            limits = (str(var), problem.args[0], problem.args[1]) if problem.args else None
+            tool_res = integrate(expr, str(var), limits)
+            if tool_res.get("status") == "ok":
+                if limits is not None:
+                    steps.append(r"\\int_{%s}^{%s} %s \, d%s = %s" % (
+                        sympy_latex(problem.args[0]), sympy_latex(problem.args[1]),
+                        sympy_latex(expr), var, tool_res["latex"]
+                    ))
                 else:
-                    tool_res = integrate(expr, var, None)
-                if tool_res.get("status") == "ok":
-                    derivation_steps.append(tool_res["latex"])  # already LaTeX of result
-                    final_answer = tool_res.get("result_str", "")
-                    routed = True
-            except Exception:
-                pass
+                    steps.append(tool_res["latex"])  # already LaTeX of result
+                return steps, tool_res.get("result_str", ""), tool_res["latex"], []
+
+        elif kind == "solve":
+            tool_res = solve_equation(expr, var.name)  # type: ignore[union-attr]
+            if tool_res.get("status") == "ok":
+                sols_set = "{" + ", ".join(tool_res["solutions"]) + "}"
+                steps.append(r"Solve\\; %s = 0 \\;\\text{for}\\; %s" % (sympy_latex(expr), var.name))  # type: ignore[union-attr]
+                sols_latex = r"\left\{%s\right\}" % ", ".join(tool_res["solutions_latex"])
+                return steps, sols_set, sols_latex, []
 
-        # 3) Solve equation like: Solve x^2 - 5x + 6 = 0 -> {2,3}
-        if not routed and ("=" in t or t.lower().startswith("solve ")):
+        elif kind == "limit":
             try:
-                # Strip leading 'solve' and optional trailing 'for <var>'
-                q = re.sub(r"^(?i)\s*solve\s*", "", text.strip())
-                q = re.sub(r"\s+for\s+[A-Za-z][A-Za-z0-9_]*.*$", "", q, flags=re.IGNORECASE)
-                eq_match = re.search(r"(.+?)=\s*(.+)", q)
-                if eq_match:
-                    lhs_raw, rhs_raw = eq_match.groups()
-                    lhs = sympify(_norm(lhs_raw))
-                    rhs = sympify(_norm(rhs_raw))
-                    expr = lhs - rhs
-                else:
-                    expr = sympify(_norm(q))
-                symbols = sorted(expr.free_symbols, key=lambda s: s.name)
-                var_symbol = symbols[0] if symbols else Symbol("x")
-                tool_res = solve_equation(str(expr), var_symbol.name)
-                if tool_res.get("status") == "ok":
-                    sols = tool_res["solutions"]
-                    sols_set = "{" + ", ".join(sols) + "}"
-                    derivation_steps.append(r"Solve\\; %s = 0 \\;\\text{for}\\; %s" % (sympy_latex(expr), var_symbol.name))
-                    final_answer = sols_set
-                    routed = True
+                point = problem.args[0]
+                direction = str(problem.args[1]) if len(problem.args) > 1 else "+"
+                res = sympy_limit(expr, var, point, direction)
+                side = "^{%s}" % direction if direction in ("+", "-") and len(problem.args) > 1 else ""
+                steps.append(r"\\lim_{%s \\to %s%s} %s = %s" % (
+                    sympy_latex(var), sympy_latex(point), side, sympy_latex(expr), sympy_latex(res)
+                ))
+                return steps, str(res), sympy_latex(res), []
             except Exception:
                 pass
 
-        # 4) limit((1+1/n)**n, n, oo)
-        if not routed and t.lower().startswith("limit("):
+        elif kind == "ode":
+            res = solve_ode(expr, var=str(var), ics=list(problem.args), timeout=self.ode_timeout)
+            if res.get("status") == "ok":
+                steps.append(res["equation_latex"])
+                steps.append(r"\text{General solution (%s)}: %s" % (res["hint"].replace("_", r"\_"), res["general_latex"]))
+                if res["constants"]:
+                    steps.append(", ".join(f"{k} = {v}" for k, v in res["constants"].items()))
+                    steps.append(res["latex"])
+                return steps, res["solution_str"], res["latex"], res["checks"]
+
+        elif kind == "series":
             try:
-                # naive parse: limit(expr, var, point)
-                inner = t[len("limit(") : -1]
-                parts = [p.strip() for p in inner.split(",")]
-                expr = sympify(_norm(parts[0]))
-                var = Symbol(parts[1])
-                point = sympify(parts[2])
-                res = sympy_limit(expr, var, point)
-                derivation_steps.append(r"\\lim_{%s \\to %s} %s = %s" % (
-                    sympy_latex(var), sympy_latex(point), sympy_latex(expr), sympy_latex(res)
-                ))
-                final_answer = str(res)
-                routed = True
+                res = sympy_series(expr, var, *problem.args)
+                steps.append(r"%s = %s" % (sympy_latex(expr), sympy_latex(res)))
+                return steps, str(res), sympy_latex(res), []
             except Exception:
                 pass
 
         # Fallback: try simplifying the entire text as an expression
-        if not routed:
-            simp = simplify_expr(t)
-            if simp.get("status") == "ok":
-                derivation_steps.append(simp["latex"])
-                final_answer = simp["simplified_str"]
-                routed = True
-
-        if not routed:
-            derivation_steps.append(r"\text{Unable to parse problem}")
-            final_answer = ""
-
-        state["solver_output"] = {
-            "derivation_steps": derivation_steps,
-            "final_answer": final_answer,
-        }
-        return state
-
-
+        simp = simplify_expr(expr.doit() if kind == "simplify" else text)  # type: ignore[attr-defined]
+        if simp.get("status") == "ok":
+            steps.append(simp["latex"])
+            return steps, simp["simplified_str"], simp["latex"], []
+        return [r"\text{Unable to parse problem}"], "", "", []
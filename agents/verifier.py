@@ -5,12 +5,16 @@ from __future__ import annotations
 from typing import Dict, List, Optional
 
 from tools.numeric import evaluate
-from tools.units import convert
+from tools.result_table import ResultTable, answers_match, default_table
+from tools.units import check_dimensions, scaling_check
 
 
 class VerifierAgent:
     model: str = "gemini-2.0-flash"
 
+    def __init__(self, result_table: Optional[ResultTable] = None) -> None:
+        self.result_table = result_table
+
     def run(self, text: str, state: Optional[Dict[str, object]] = None) -> Dict[str, object]:
         state = {} if state is None else dict(state)
         details: List[str] = []
@@ -28,6 +32,49 @@ class VerifierAgent:
         except Exception:
             pass
 
+        # Checks the solver already ran (checkodesol, initial conditions)
+        for check in solver.get("checks", []):
+            details.append(f"{check['check']}: {'passed' if check['passed'] else 'FAILED'}")
+            if not check["passed"]:
+                status = "failed"
+
+        # Oracle check against the known-results table
+        problem = solver.get("problem")
+        if problem and final_answer:
+            if solver.get("source") == "table":
+                details.append("Answer taken from known-results table")
+            else:
+                table = self.result_table if self.result_table is not None else default_table()
+                known = table.lookup(problem["kind"], problem["expr"], problem["var"] or None, problem["args"])
+                if known is not None:
+                    if answers_match(str(final_answer), known.result):
+                        details.append(f"Matches known result: {known.result}")
+                    else:
+                        status = "failed"
+                        details.append(f"Known result mismatch: expected {known.result}")
+
+        # Dimensional analysis when the caller declares units, e.g.
+        # state["units"] = {"v": "m/s", "t": "s"}, state["answer_unit"] = "m"
+        units = state.get("units")
+        if units:
+            # expression -> expected unit; an answer equal to the problem is checked once
+            targets = {problem["expr"]: None} if problem else {}
+            if final_answer and not str(final_answer).startswith("{"):
+                targets[str(final_answer)] = state.get("answer_unit")
+            for expr, expected in targets.items():
+                dims = check_dimensions(expr, units, expected)
+                if dims.get("status") != "ok":
+                    continue
+                if dims["consistent"]:
+                    sampled = scaling_check(expr, units)
+                    details.append(f"Units consistent [{dims['dimension']}]: {expr}")
+                    if sampled.get("status") == "ok" and sampled["passed"] < 1.0:
+                        status = "failed"
+                        details.append(f"Unit scaling check failed on {1 - sampled['passed']:.1%} of samples: {expr}")
+                else:
+                    status = "failed"
+                    details.append(f"Unit mismatch in {expr}: {dims['message']}")
+
         verification_report = {"status": status, "details": details}
         state["verification_report"] = verification_report
         return state
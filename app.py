@@ -7,15 +7,19 @@ Import-safe: Only builds/executes when invoked as a script.
 
 import argparse
 import os
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, Iterator, List, Optional
 
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
 
 from orchestrations.pipeline import build_root_agent
+from orchestrations.results_store import ResultsStore, row_from_state
+from orchestrations.work_queue import WorkQueue, run_worker, serve_workers
+from orchestrations.workers import MemoryGovernor, MemoryPolicy, WorkerSupervisor
 
 
 console = Console()
@@ -39,27 +43,117 @@ def run_query(session_id: str, text: str) -> Dict[str, object]:
     verification_report = state.get("verification_report", {})
     console.print(Panel(final_writeup, title="Final Writeup"))
     console.print(Panel(str(verification_report), title="Verification"))
-    return {"final_writeup": final_writeup, "verification_report": verification_report}
+    return {"final_writeup": final_writeup, "verification_report": verification_report, "state": state}
 
 
-def _run_file(session_id: str, path: str) -> None:
-    p = Path(path)
-    lines = [line.strip() for line in p.read_text().splitlines() if line.strip()]
+@contextmanager
+def _report_writer() -> Iterator[Callable[[str, Dict[str, object]], None]]:
+    """Yield add(prompt, result), which appends one problem to a new Markdown
+    report as soon as it is called, so write-ups are not held until the end."""
     ts = datetime.now().strftime("%Y%m%d-%H%M%S")
     reports_dir = Path("./reports")
     reports_dir.mkdir(parents=True, exist_ok=True)
     out_path = reports_dir / f"report-{ts}.md"
-    out_lines = ["# Panguan-GPT Report", ""]
-    for q in lines:
-        res = run_query(session_id, q)
-        out_lines.append("## Problem\n" + q)
-        out_lines.append("\n### Final Writeup\n" + res["final_writeup"])  # type: ignore[index]
-        out_lines.append("\n### Verification\n" + str(res["verification_report"]))  # type: ignore[index]
-        out_lines.append("")
-    out_path.write_text("\n".join(out_lines))
+    with out_path.open("w") as fh:
+        fh.write("# Panguan-GPT Report\n")
+
+        def add(prompt: str, res: Dict[str, object]) -> None:
+            fh.write("\n## Problem\n" + prompt)
+            fh.write("\n\n### Final Writeup\n" + str(res["final_writeup"]))
+            fh.write("\n\n### Verification\n" + str(res["verification_report"]) + "\n")
+            fh.flush()
+
+        yield add
     console.print(f"Saved report to {out_path}")
 
 
+@contextmanager
+def _store_writer(path: Optional[str], source: str, chunk: int = 500) -> Iterator[Callable[[Dict[str, object]], None]]:
+    """Yield add(row), which appends rows to the results store at `path` as they
+    arrive, one transaction per `chunk` rows. A no-op without a store."""
+    if not path:
+        yield lambda row: None
+        return
+    store = ResultsStore(path)
+    run = store.start_run(source=source)
+    pending: List[Dict[str, object]] = []
+    written = 0
+
+    def flush() -> None:
+        nonlocal written
+        written += store.append(run, pending, start_idx=written)
+        pending.clear()
+
+    def add(row: Dict[str, object]) -> None:
+        pending.append(row)
+        if len(pending) >= chunk:
+            flush()
+
+    try:
+        yield add
+    finally:
+        if pending:
+            flush()
+        store.close()
+        console.print(f"Stored {written} results as {run} in {path}")
+
+
+def _read_prompts(path: str) -> List[str]:
+    return [line.strip() for line in Path(path).read_text().splitlines() if line.strip()]
+
+
+def _run_file(
+    session_id: str,
+    path: str,
+    workers: int = 0,
+    policy: Optional[MemoryPolicy] = None,
+    store: Optional[str] = None,
+) -> None:
+    lines = _read_prompts(path)
+    # One store transaction per prompt: rows are on disk as soon as each prompt finishes.
+    with _report_writer() as add_result, _store_writer(store, path, chunk=1) as add_row:
+        if workers > 0:
+            supervisor = WorkerSupervisor(num_workers=workers, policy=policy)
+            # Results arrive in completion order; the report is written in input
+            # order, holding back only results that finished ahead of their turn.
+            early: Dict[int, Dict[str, object]] = {}
+            next_idx = 0
+            for idx, res in supervisor.imap_unordered(lines, state={"session_id": session_id}):
+                st = res.get("state", {}) if res.get("status") == "ok" else {}
+                error = "" if st else str(res.get("message", ""))
+                add_row(dict(row_from_state(lines[idx], st, error), idx=idx))  # type: ignore[arg-type]
+                early[idx] = {
+                    "final_writeup": st.get("final_writeup", "") or f"Error: {error}",  # type: ignore[union-attr]
+                    "verification_report": st.get("verification_report", {}),  # type: ignore[union-attr]
+                }
+                while next_idx in early:
+                    add_result(lines[next_idx], early.pop(next_idx))
+                    next_idx += 1
+            console.print(Panel(str(supervisor.metrics()), title="Worker Metrics"))
+        else:
+            governor = MemoryGovernor(policy or MemoryPolicy(max_requests=0))
+            for q in lines:
+                res = run_query(session_id, q)
+                add_result(q, res)
+                add_row(row_from_state(q, res["state"]))  # type: ignore[arg-type]
+                governor.after_request()
+
+
+def _collect(queue: WorkQueue, batch: str, store: Optional[str] = None) -> None:
+    """Wait for a queued batch and write it out in the usual report format."""
+    console.print(f"Waiting for {batch}: {queue.progress(batch)}")
+    queue.wait(batch)
+    with _report_writer() as add_result, _store_writer(store, batch) as add_row:
+        for job in queue.results(batch):
+            res = job["result"] or {}
+            add_result(job["prompt"], {  # type: ignore[arg-type]
+                "final_writeup": res.get("final_writeup", "") or f"Error: {job['error']}",  # type: ignore[union-attr]
+                "verification_report": res.get("verification_report", {}),  # type: ignore[union-attr]
+            })
+            add_row(row_from_state(job["prompt"], res, job["error"] if job["status"] != "done" else ""))  # type: ignore[arg-type]
+    console.print(f"{batch}: {queue.progress(batch)}")
+
+
 def _run_demos(session_id: str) -> None:
     run_query(session_id, "Compute ∫_0^1 x^2 dx")
     run_query(session_id, "Find the general solution to y'' - y = 0 and verify initial conditions y(0)=1, y'(0)=0")
@@ -70,18 +164,56 @@ if __name__ == "__main__":
     parser.add_argument("--file", type=str, default=None)
     parser.add_argument("--once", type=str, default=None)
     parser.add_argument("--demo", action="store_true")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes for --file (0 = in-process)")
+    parser.add_argument("--max-requests", type=int, default=1000, help="recycle a worker after N requests")
+    parser.add_argument("--cache-clear-rss-mb", type=float, default=768.0, help="clear SymPy caches above this RSS")
+    parser.add_argument(
+        "--cache-clear-growth-mb", type=float, default=128.0,
+        help="after a cache clear, clear again only once RSS has grown by this much",
+    )
+    parser.add_argument("--recycle-rss-mb", type=float, default=1536.0, help="recycle a worker above this RSS")
+    parser.add_argument("--queue", type=str, default=None, help="SQLite work queue shared by coordinator and workers")
+    parser.add_argument("--worker", action="store_true", help="solve jobs from --queue")
+    parser.add_argument("--collect", type=str, default=None, help="write the report for a queued batch id")
+    parser.add_argument("--lease-seconds", type=float, default=60.0)
+    parser.add_argument("--idle-exit", type=float, default=None, help="worker exits after this many idle seconds")
+    parser.add_argument("--no-wal", action="store_true", help="rollback journal for a queue shared over a network filesystem")
+    parser.add_argument("--store", type=str, default=None, help="also append per-prompt results to this SQLite store")
     args = parser.parse_args()
 
     sess = create_session("cli-user")
     session_id = sess["session_id"]
 
-    if args.file:
-        _run_file(session_id, args.file)
+    policy = MemoryPolicy(
+        max_requests=args.max_requests,
+        cache_clear_rss_mb=args.cache_clear_rss_mb,
+        recycle_rss_mb=args.recycle_rss_mb,
+        cache_clear_growth_mb=args.cache_clear_growth_mb,
+    )
+
+    if args.queue and args.worker:
+        if args.workers > 1:
+            serve_workers(
+                args.queue, args.workers, policy=policy, idle_exit=args.idle_exit,
+                lease_seconds=args.lease_seconds, wal=not args.no_wal,
+            )
+        else:
+            run_worker(args.queue, policy=policy, idle_exit=args.idle_exit, lease_seconds=args.lease_seconds, wal=not args.no_wal)
+    elif args.queue and args.collect:
+        _collect(WorkQueue(args.queue, wal=not args.no_wal), args.collect, store=args.store)
+    elif args.queue and args.file:
+        # Coordinator: enqueue, then wait for workers on any node and collect.
+        queue = WorkQueue(args.queue, wal=not args.no_wal)
+        batch = queue.enqueue(_read_prompts(args.file), source=args.file)
+        console.print(f"Enqueued {batch} into {args.queue}")
+        _collect(queue, batch, store=args.store)
+    elif args.file:
+        _run_file(session_id, args.file, workers=args.workers, policy=policy, store=args.store)
     elif args.once:
         run_query(session_id, args.once)
     elif args.demo:
         _run_demos(session_id)
     else:
-        console.print("Provide --once, --file, or --demo")
+        console.print("Provide --once, --file, --demo, or --queue with --file/--worker/--collect")
 
 
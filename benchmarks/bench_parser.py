@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+"""Parse-throughput benchmark: tools.parser vs the previous regex + sympify path.
+
+Run from the project root:
+    python -m benchmarks.bench_parser --rounds 200
+"""
+
+import argparse
+import time
+from typing import Callable, List
+
+from sympy import sympify
+
+from tools import parser
+
+
+# Inputs the old path could handle (plain SymPy syntax), so both sides do the same work.
+CORPUS: List[str] = [
+    "x**2",
+    "x^2 - 5*x + 6",
+    "sin(x)^2 + cos(x)^2",
+    "(1+1/n)**n",
+    "exp(-x**2)",
+    "1/(x**2 + 1)",
+    "x - x**3/6 + x**5/120",
+    "-sqrt(5)/2 + 1/2",
+    "log(x)*x**3/3 - x**3/9",
+    "(x**2 - 1)/(x - 1)",
+]
+
+
+def _sympify_path(text: str):
+    return sympify(text.replace("^", "**"))
+
+
+def _time(fn: Callable[[str], object], rounds: int, before_round: Callable[[], None] = lambda: None) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        before_round()
+        for text in CORPUS:
+            fn(text)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rounds", type=int, default=200)
+    args = ap.parse_args()
+    n = args.rounds * len(CORPUS)
+
+    old = _time(_sympify_path, args.rounds)
+    cold = _time(parser.parse, args.rounds, before_round=parser.clear_cache)
+    parser.clear_cache()
+    warm = _time(parser.parse, args.rounds)
+
+    print(f"{'path':<28}{'parses/s':>12}{'us/parse':>12}")
+    for label, secs in (
+        ("sympify (regex normalize)", old),
+        ("tools.parser (cold cache)", cold),
+        ("tools.parser (memoized)", warm),
+    ):
+        print(f"{label:<28}{n / secs:>12.0f}{secs / n * 1e6:>12.1f}")
+    print(parser.cache_info())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+"""Load generator: replay prompt logs or synthetic problem mixes against the pipeline.
+
+Targets the in-process `build_root_agent()` pipeline by default, or an HTTP
+endpoint (`--url`) that takes the prompt in a JSON body, {"input": ...} as the
+ADK api_server's /run does (`--body-key` to change the key). Arrivals are
+open-loop (replayed timestamps, or a Poisson/uniform rate; latency is measured
+from the scheduled arrival so queueing delay is not hidden) or closed-loop
+(`--concurrency` users, each sending its next prompt when the previous one
+returns). Results are saved as JSON and two runs can be compared.
+
+Run from the project root:
+    python -m benchmarks.loadgen --mix integral=3,solve=2,limit=1 --rate 20 --requests 500 -o run.json
+    python -m benchmarks.loadgen --log prompts.jsonl --speed 2 --concurrency 8 -o replay.json
+    python -m benchmarks.loadgen --closed --concurrency 4 --duration 60 -o closed.json
+    python -m benchmarks.loadgen --compare base.json run.json
+
+The in-process target shares one interpreter, so symbolic work is serialized
+by the GIL; point --url at a multi-process server to measure real concurrency.
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Synthetic prompt templates per route; parameters are drawn per request so
+# repeated runs exercise the solver rather than only the caches.
+_TEMPLATES: Dict[str, Callable[[random.Random], str]] = {
+    "integral": lambda r: f"Compute ∫_0^{r.randint(1, 5)} x^{r.randint(1, 6)} dx",
+    "solve": lambda r: (lambda a, b: f"Solve x^2 - {a + b}x + {a * b} = 0")(r.randint(1, 9), r.randint(1, 9)),
+    "limit": lambda r: f"limit((1+{r.randint(1, 9)}/n)**n, n, oo)",
+    "series": lambda r: f"series({r.choice(['sin', 'cos', 'exp'])}({r.randint(1, 5)}x), x, 0, {r.randint(3, 8)})",
+    "simplify": lambda r: (lambda a: f"Simplify (x^2 - {a * a})/(x - {a})")(r.randint(1, 12)),
+    "ode": lambda r: f"y'' + {r.randint(1, 9)}y = 0, y(0)=1, y'(0)=0",
+}
+
+DEFAULT_MIX = "integral=3,solve=3,limit=2,series=1,simplify=1"
+
+
+@dataclass
+class Arrival:
+    offset: float  # seconds after the start of the run
+    prompt: str
+
+
+@dataclass
+class Sample:
+    offset: float
+    latency: float
+    status: str  # "ok", "error" or "timeout"
+    route: str = ""
+    verification: str = ""
+    stages: Dict[str, float] = field(default_factory=dict)
+    error: str = ""
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in _TEMPLATES:
+            raise ValueError(f"unknown route in mix: {name} (expected one of {', '.join(_TEMPLATES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def synthetic_prompts(mix: Dict[str, float], seed: int = 0) -> Iterator[str]:
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    while True:
+        yield _TEMPLATES[rng.choices(names, weights)[0]](rng)
+
+
+def _timestamp(value: object) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def replay_arrivals(path: str, speed: float = 1.0) -> List[Arrival]:
+    """Arrivals from a JSONL log of {"prompt": ..., "ts": epoch seconds or ISO-8601}.
+
+    Inter-arrival gaps are kept, divided by `speed`; lines without a timestamp
+    follow the previous one immediately.
+    """
+    rows: List[Tuple[Optional[float], str]] = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            ts = rec.get("ts", rec.get("timestamp"))
+            rows.append((None if ts is None else _timestamp(ts), str(rec["prompt"])))
+    stamps = [ts for ts, _ in rows if ts is not None]
+    t0 = min(stamps) if stamps else 0.0
+    arrivals, last = [], 0.0
+    for ts, prompt in rows:
+        last = last if ts is None else (ts - t0) / speed
+        arrivals.append(Arrival(last, prompt))
+    arrivals.sort(key=lambda a: a.offset)
+    return arrivals
+
+
+def rate_arrivals(prompts: Iterator[str], rate: float, count: int, poisson: bool = True, seed: int = 0) -> List[Arrival]:
+    rng = np.random.default_rng(seed)
+    gaps = rng.exponential(1.0 / rate, count) if poisson else np.full(count, 1.0 / rate)
+    offsets = np.concatenate([[0.0], np.cumsum(gaps)[:-1]])
+    return [Arrival(float(t), next(prompts)) for t in offsets]
+
+
+def in_process_target() -> Callable[[str, float], Dict[str, object]]:
+    from orchestrations.pipeline import build_root_agent
+
+    root = build_root_agent()
+
+    def call(prompt: str, timeout: float) -> Dict[str, object]:
+        return root.run(prompt, {"session_id": "loadgen"})
+
+    return call
+
+
+def _response_state(body: object) -> Dict[str, object]:
+    """The pipeline state in a response: the body itself, or its nested "state" or "output" object."""
+    if not isinstance(body, dict):
+        return {}
+    if "solver_output" not in body:
+        for key in ("state", "output"):
+            if isinstance(body.get(key), dict):
+                return body[key]
+    return body
+
+
+def http_target(url: str, body_key: str = "input") -> Callable[[str, float], Dict[str, object]]:
+    def call(prompt: str, timeout: float) -> Dict[str, object]:
+        req = urllib.request.Request(
+            url, data=json.dumps({body_key: prompt}).encode("utf-8"), headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            body = resp.read()
+        return _response_state(json.loads(body)) if body else {}
+
+    return call
+
+
+def _issue(call: Callable[[str, float], Dict[str, object]], prompt: str, offset: float, t0: float, timeout: float) -> Sample:
+    try:
+        state = call(prompt, timeout)
+        latency = time.perf_counter() - t0 - offset
+        solver = state.get("solver_output", {}) or {}
+        return Sample(
+            offset=offset,
+            latency=latency,
+            # the in-process pipeline cannot be interrupted; late answers count as timeouts
+            status="timeout" if latency > timeout else "ok",
+            route=str(solver.get("route", "") or state.get("route", "")),  # type: ignore[union-attr]
+            verification=str((state.get("verification_report") or {}).get("status", "")),  # type: ignore[union-attr]
+            stages=dict(state.get("stage_timings", {}) or {}),  # type: ignore[call-overload]
+        )
+    except (TimeoutError, urllib.error.URLError) as exc:
+        is_timeout = isinstance(exc, TimeoutError) or isinstance(getattr(exc, "reason", None), TimeoutError)
+        return Sample(offset, time.perf_counter() - t0 - offset, "timeout" if is_timeout else "error", error=str(exc))
+    except Exception as exc:  # noqa: BLE001 - counted, not raised
+        return Sample(offset, time.perf_counter() - t0 - offset, "error", error=str(exc))
+
+
+def run_open(
+    call: Callable[[str, float], Dict[str, object]], arrivals: Sequence[Arrival], concurrency: int, timeout: float
+) -> Tuple[List[Sample], float]:
+    """Issue each prompt at its arrival offset; at most `concurrency` in flight."""
+    samples: List[Sample] = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        t0 = time.perf_counter()
+        futures = []
+        for a in arrivals:
+            delay = t0 + a.offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(_issue, call, a.prompt, a.offset, t0, timeout))
+        samples = [f.result() for f in futures]
+    return samples, time.perf_counter() - t0
+
+
+def run_closed(
+    call: Callable[[str, float], Dict[str, object]],
+    prompts: Iterator[str],
+    concurrency: int,
+    timeout: float,
+    count: Optional[int] = None,
+    duration: Optional[float] = None,
+    think: float = 0.0,
+) -> Tuple[List[Sample], float]:
+    """`concurrency` users loop send → wait → think until `count` requests or `duration` seconds."""
+    lock = threading.Lock()
+    samples: List[Sample] = []
+    issued = [0]
+    t0 = time.perf_counter()
+
+    def user() -> None:
+        while True:
+            with lock:
+                if count is not None and issued[0] >= count:
+                    return
+                if duration is not None and time.perf_counter() - t0 >= duration:
+                    return
+                issued[0] += 1
+                prompt = next(prompts)
+            sample = _issue(call, prompt, time.perf_counter() - t0, t0, timeout)
+            with lock:
+                samples.append(sample)
+            if think:
+                time.sleep(think)
+
+    threads = [threading.Thread(target=user, daemon=True) for _ in range(max(1, concurrency))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    samples.sort(key=lambda s: s.offset)
+    return samples, time.perf_counter() - t0
+
+
+def _percentiles(values: Sequence[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    arr = np.asarray(values, dtype=float)
+    p50, p90, p95, p99 = np.percentile(arr, [50, 90, 95, 99])
+    return {"mean": float(arr.mean()), "p50": float(p50), "p90": float(p90), "p95": float(p95),
+            "p99": float(p99), "max": float(arr.max())}
+
+
+def summarize(samples: Sequence[Sample], wall: float) -> Dict[str, object]:
+    """Throughput, latency percentiles, error/timeout rates, and per-stage and per-route breakdowns."""
+    n = len(samples)
+    ok = [s for s in samples if s.status == "ok"]
+    stage_names = sorted({name for s in ok for name in s.stages})
+    routes: Dict[str, List[Sample]] = {}
+    for s in samples:
+        routes.setdefault(s.route or "-", []).append(s)
+    return {
+        "requests": n,
+        "wall_seconds": wall,
+        "throughput_rps": len(ok) / wall if wall > 0 else 0.0,
+        "error_rate": sum(s.status == "error" for s in samples) / n if n else 0.0,
+        "timeout_rate": sum(s.status == "timeout" for s in samples) / n if n else 0.0,
+        "verification_failed_rate": sum(s.verification == "failed" for s in ok) / len(ok) if ok else 0.0,
+        "latency": _percentiles([s.latency for s in ok]),
+        "stages": {name: _percentiles([s.stages[name] for s in ok if name in s.stages]) for name in stage_names},
+        "routes": {
+            route: {"requests": len(group), "latency": _percentiles([s.latency for s in group if s.status == "ok"])}
+            for route, group in sorted(routes.items())
+        },
+        "errors": sorted({s.error for s in samples if s.error})[:20],
+    }
+
+
+def print_summary(summary: Dict[str, object]) -> None:
+    lat = summary["latency"] or {}
+    print(f"requests {summary['requests']}  wall {summary['wall_seconds']:.2f}s  "
+          f"throughput {summary['throughput_rps']:.2f} req/s")
+    print(f"errors {summary['error_rate']:.2%}  timeouts {summary['timeout_rate']:.2%}  "
+          f"verification failed {summary['verification_failed_rate']:.2%}")
+    print(f"{'latency (ms)':<20}" + "".join(f"{k:>10}" for k in lat))
+    print(f"{'end-to-end':<20}" + "".join(f"{v * 1e3:>10.1f}" for v in lat.values()))  # type: ignore[union-attr]
+    for name, stats in summary["stages"].items():  # type: ignore[union-attr]
+        print(f"{name:<20}" + "".join(f"{v * 1e3:>10.1f}" for v in stats.values()))
+    for route, info in summary["routes"].items():  # type: ignore[union-attr]
+        p95 = info["latency"].get("p95")
+        print(f"  route {route:<12}{info['requests']:>6} req" + (f"  p95 {p95 * 1e3:.1f} ms" if p95 is not None else ""))
+
+
+_COMPARED = [
+    ("throughput_rps", ("throughput_rps",), True),
+    ("latency p50", ("latency", "p50"), False),
+    ("latency p95", ("latency", "p95"), False),
+    ("latency p99", ("latency", "p99"), False),
+    ("error_rate", ("error_rate",), False),
+    ("timeout_rate", ("timeout_rate",), False),
+]
+
+
+def _dig(d: Dict[str, object], path: Sequence[str]) -> Optional[float]:
+    cur: object = d
+    for key in path:
+        if not isinstance(cur, dict) or key not in cur:
+            return None
+        cur = cur[key]
+    return float(cur)  # type: ignore[arg-type]
+
+
+def compare(base: Dict[str, object], new: Dict[str, object], noise: float = 0.02) -> List[Dict[str, object]]:
+    """Per-metric rows: metric, base, new, change (relative), better (True/False, or
+    None when either side is missing or the change is within `noise`)."""
+    rows = []
+    a, b = base["summary"], new["summary"]
+    paths = list(_COMPARED) + [
+        (f"stage {name} p95", ("stages", name, "p95"), False)
+        for name in sorted(set(a.get("stages", {})) | set(b.get("stages", {})))  # type: ignore[union-attr]
+    ]
+    for label, path, higher_is_better in paths:
+        x, y = _dig(a, path), _dig(b, path)  # type: ignore[arg-type]
+        change = None if x in (None, 0) or y is None else (y - x) / x
+        if x is None or y is None or x == y or (change is not None and abs(change) <= noise):
+            better = None
+        else:
+            better = (y > x) == higher_is_better
+        rows.append({"metric": label, "base": x, "new": y, "change": change, "better": better})
+    return rows
+
+
+def print_comparison(rows: Sequence[Dict[str, object]]) -> None:
+    print(f"{'metric':<32}{'base':>12}{'new':>12}{'change':>10}")
+    for r in rows:
+        fmt = lambda v: "-" if v is None else f"{v:.4g}"  # noqa: E731
+        change = "-" if r["change"] is None else f"{r['change']:+.1%}"
+        mark = {True: "  better", False: "  worse", None: ""}[r["better"]]  # type: ignore[index]
+        print(f"{r['metric']:<32}{fmt(r['base']):>12}{fmt(r['new']):>12}{change:>10}{mark}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Replay or synthesize load against the pipeline")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--log", help="JSONL prompt log with arrival timestamps (ts)")
+    src.add_argument("--mix", default=DEFAULT_MIX, help=f"synthetic route weights (default: {DEFAULT_MIX})")
+    ap.add_argument("--speed", type=float, default=1.0, help="replay speed-up factor")
+    ap.add_argument("--rate", type=float, default=10.0, help="open-loop arrivals per second (synthetic)")
+    ap.add_argument("--uniform", action="store_true", help="evenly spaced arrivals instead of Poisson")
+    ap.add_argument("--closed", action="store_true", help="closed loop: each user waits for its response")
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--duration", type=float, help="closed loop: run for this many seconds instead")
+    ap.add_argument("--think", type=float, default=0.0, help="closed loop: pause between a user's requests")
+    ap.add_argument("--timeout", type=float, default=30.0)
+    ap.add_argument("--url", help="POST prompts to this endpoint instead of the in-process pipeline")
+    ap.add_argument("--body-key", default="input", help="JSON key holding the prompt in --url requests (default: input)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("-o", "--out", help="save the run as JSON")
+    ap.add_argument("--keep-samples", action="store_true", help="store every request in the saved run")
+    ap.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two saved runs and exit")
+    args = ap.parse_args(argv)
+
+    if args.compare:
+        base, new = (json.loads(Path(p).read_text()) for p in args.compare)
+        print_comparison(compare(base, new))
+        return
+
+    call = http_target(args.url, args.body_key) if args.url else in_process_target()
+    if args.log:
+        arrivals = replay_arrivals(args.log, args.speed)
+        # closed loop replays the log's prompts (cycling when run for --duration)
+        prompts: Iterator[str] = itertools.cycle([a.prompt for a in arrivals])
+    else:
+        prompts = synthetic_prompts(parse_mix(args.mix), args.seed)
+        arrivals = [] if args.closed else rate_arrivals(prompts, args.rate, args.requests, not args.uniform, args.seed)
+
+    if args.closed:
+        count = None if args.duration else (len(arrivals) if args.log else args.requests)
+        samples, wall = run_closed(call, prompts, args.concurrency, args.timeout, count, args.duration, args.think)
+    else:
+        samples, wall = run_open(call, arrivals, args.concurrency, args.timeout)
+
+    summary = summarize(samples, wall)
+    print_summary(summary)
+    if args.out:
+        run = {
+            "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "summary": summary,
+        }
+        if args.keep_samples:
+            run["samples"] = [asdict(s) for s in samples]
+        Path(args.out).write_text(json.dumps(run, indent=2))
+        print(f"Saved run to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
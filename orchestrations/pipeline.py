@@ -2,7 +2,8 @@ from __future__ import annotations
 
 """Pipeline orchestration: Planner → Parallel(Solver, Research) → Verifier → Explainer."""
 
-from typing import Dict
+import time
+from typing import Callable, Dict, Optional
 
 from agents.planner import PlannerAgent
 from agents.solver import MathSolverAgent
@@ -11,14 +12,30 @@ from agents.verifier import VerifierAgent
 from agents.explainer import ExplainerAgent
 
 
+def _timed_run(agent, text: str, state: Dict[str, object]) -> Dict[str, object]:
+    """Run one step and record its wall time in state["stage_timings"] (seconds,
+    keyed by agent class). Composite steps record their children instead."""
+    start = time.perf_counter()
+    state = agent.run(text, state)
+    if not isinstance(agent, (SequentialAgent, ParallelAgent)):
+        timings = dict(state.get("stage_timings", {}))  # type: ignore[call-overload]
+        timings[type(agent).__name__] = time.perf_counter() - start
+        state["stage_timings"] = timings
+    return state
+
+
 class SequentialAgent:
-    def __init__(self, steps):
+    def __init__(self, steps, on_step: Optional[Callable[[object, Dict[str, object]], None]] = None):
         self.steps = steps
+        # Called with (step, state) after each step, e.g. to feed a tools.render.Renderer
+        self.on_step = on_step
 
     def run(self, text: str, state: Dict[str, object] | None = None) -> Dict[str, object]:
         state = {} if state is None else dict(state)
         for step in self.steps:
-            state = step.run(text, state)
+            state = _timed_run(step, text, state)
+            if self.on_step is not None:
+                self.on_step(step, state)
         return state
 
 
@@ -30,23 +47,26 @@ class ParallelAgent:
         state = {} if state is None else dict(state)
         # Run sequentially here to avoid threading; merge outputs
         for agent in self.agents:
-            state = agent.run(text, state)
+            state = _timed_run(agent, text, state)
         return state
 
 
-def build_root_agent() -> SequentialAgent:
+def build_root_agent(
+    output_format: str = "markdown",
+    on_step: Optional[Callable[[object, Dict[str, object]], None]] = None,
+) -> SequentialAgent:
     planner = PlannerAgent()
     solver = MathSolverAgent()
     research = ResearchAgent()
     verifier = VerifierAgent()
-    explainer = ExplainerAgent()
+    explainer = ExplainerAgent(output_format)
 
     root = SequentialAgent([
         planner,
         ParallelAgent([solver, research]),
         verifier,
         explainer,
-    ])
+    ], on_step=on_step)
     return root
 
 
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+"""Append-only SQLite store of per-prompt batch results.
+
+One row per prompt with typed columns (route, final answer, verification
+status, one column per pipeline stage's time, cache-hit flags) instead of
+prose, so a large run can be analysed with SQL aggregates. Rows are appended
+in batched transactions; the summary and query commands stream results from
+SQLite and never load a whole run into memory.
+
+    python -m orchestrations.results_store results.db summary
+    python -m orchestrations.results_store results.db slowest --limit 20
+    python -m orchestrations.results_store results.db sql "SELECT route, COUNT(*) FROM results GROUP BY route"
+"""
+
+import json
+import sqlite3
+import time
+import uuid
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+
+# Pipeline stage (agent class) -> column holding its wall time in milliseconds
+STAGE_COLUMNS: Dict[str, str] = {
+    "PlannerAgent": "planner_ms",
+    "MathSolverAgent": "solver_ms",
+    "ResearchAgent": "research_ms",
+    "VerifierAgent": "verifier_ms",
+    "ExplainerAgent": "explainer_ms",
+}
+
+COLUMNS = (
+    "run", "idx", "prompt", "status", "route", "final_answer", "verification",
+    "answer_source", "table_hit", "parse_cache_hit", "total_ms",
+) + tuple(STAGE_COLUMNS.values()) + ("error",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run TEXT PRIMARY KEY,
+    source TEXT,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    prompt TEXT NOT NULL,
+    status TEXT NOT NULL,
+    route TEXT,
+    final_answer TEXT,
+    verification TEXT,
+    answer_source TEXT,
+    table_hit INTEGER,
+    parse_cache_hit INTEGER,
+    total_ms REAL,
+    planner_ms REAL,
+    solver_ms REAL,
+    research_ms REAL,
+    verifier_ms REAL,
+    explainer_ms REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS results_route ON results (run, route);
+CREATE INDEX IF NOT EXISTS results_verification ON results (run, verification);
+CREATE INDEX IF NOT EXISTS results_total ON results (run, total_ms);
+"""
+
+
+def row_from_state(prompt: str, state: Optional[Mapping[str, object]], error: str = "") -> Dict[str, object]:
+    """Flatten a pipeline state (or the queue's stored result) into one row."""
+    state = state or {}
+    solver = state.get("solver_output") or {}
+    verify = state.get("verification_report") or {}
+    timings = state.get("stage_timings") or {}
+    row: Dict[str, object] = {
+        "prompt": prompt,
+        "status": "error" if error or not state else "ok",
+        "route": solver.get("route") or state.get("route") or "",  # type: ignore[union-attr]
+        "final_answer": str(solver.get("final_answer", state.get("final_answer", "")) or ""),  # type: ignore[union-attr]
+        "verification": verify.get("status", ""),  # type: ignore[union-attr]
+        "answer_source": solver.get("source") or state.get("source") or "",  # type: ignore[union-attr]
+        "parse_cache_hit": solver.get("parse_cache_hit", state.get("parse_cache_hit")),  # type: ignore[union-attr]
+        "error": error or None,
+    }
+    row["table_hit"] = row["answer_source"] == "table"
+    total = 0.0
+    for stage, column in STAGE_COLUMNS.items():
+        secs = timings.get(stage)  # type: ignore[union-attr]
+        row[column] = None if secs is None else secs * 1e3
+        total += secs or 0.0
+    row["total_ms"] = total * 1e3 if timings else None
+    return row
+
+
+class ResultsStore:
+    """Per-prompt results of batch runs in a single SQLite file.
+
+    Usage:
+        store = ResultsStore("results.db")
+        run = store.start_run(source="prompts.txt")
+        store.append(run, [row_from_state(prompt, state)])
+        store.summary(run)
+    """
+
+    def __init__(self, path: str, wal: bool = True) -> None:
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        if wal:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def start_run(self, source: str = "", run: Optional[str] = None) -> str:
+        run = run or f"run-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self._conn.execute(
+            "INSERT OR IGNORE INTO runs (run, source, created) VALUES (?, ?, ?)", (run, source, time.time())
+        )
+        return run
+
+    def append(self, run: str, rows: Iterable[Mapping[str, object]], start_idx: Optional[int] = None, chunk: int = 500) -> int:
+        """Append rows in transactions of `chunk`; `idx` defaults to the row's
+        position after the rows already stored for `run`. Returns rows written."""
+        if start_idx is None:
+            start_idx = self._conn.execute("SELECT COUNT(*) FROM results WHERE run=?", (run,)).fetchone()[0]
+        sql = f"INSERT INTO results ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        written = 0
+        pending: List[tuple] = []
+
+        def flush() -> None:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, pending)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            pending.clear()
+
+        for i, row in enumerate(rows):
+            values = dict(row, run=run, idx=row.get("idx", start_idx + i))
+            pending.append(tuple(
+                int(v) if isinstance(v, bool) else v for v in (values.get(c) for c in COLUMNS)
+            ))
+            written += 1
+            if len(pending) >= chunk:
+                flush()
+        if pending:
+            flush()
+        return written
+
+    def runs(self) -> List[Dict[str, object]]:
+        rows = self._conn.execute(
+            "SELECT r.run, r.source, r.created, COUNT(x.id) FROM runs r "
+            "LEFT JOIN results x ON x.run = r.run GROUP BY r.run ORDER BY r.created"
+        ).fetchall()
+        return [{"run": run, "source": src, "created": created, "results": n} for run, src, created, n in rows]
+
+    def latest_run(self) -> Optional[str]:
+        row = self._conn.execute("SELECT run FROM runs ORDER BY created DESC LIMIT 1").fetchone()
+        return None if row is None else row[0]
+
+    def _percentile(self, run: str, q: float, route: Optional[str] = None) -> Optional[float]:
+        where, params = "run=? AND total_ms IS NOT NULL", [run]
+        if route is not None:
+            where, params = where + " AND route=?", params + [route]
+        n = self._conn.execute(f"SELECT COUNT(*) FROM results WHERE {where}", params).fetchone()[0]
+        if not n:
+            return None
+        row = self._conn.execute(
+            f"SELECT total_ms FROM results WHERE {where} ORDER BY total_ms LIMIT 1 OFFSET ?",
+            params + [min(n - 1, int(q * n))],
+        ).fetchone()
+        return row[0]
+
+    def summary(self, run: Optional[str] = None) -> Dict[str, object]:
+        """Aggregates for `run` (default: the latest): totals, rates, per-route
+        and per-stage statistics, all computed in SQL."""
+        run = run or self.latest_run()
+        if run is None:
+            return {"run": None, "results": 0}
+        c = self._conn
+        total, errors, failed, table_hits, parse_hits, mean_ms, max_ms = c.execute(
+            "SELECT COUNT(*), SUM(status='error'), SUM(verification='failed'), SUM(table_hit), "
+            "SUM(parse_cache_hit), AVG(total_ms), MAX(total_ms) FROM results WHERE run=?",
+            (run,),
+        ).fetchone()
+        routes = {}
+        for route, n, err, fail, hits, avg, worst in c.execute(
+            "SELECT route, COUNT(*), SUM(status='error'), SUM(verification='failed'), SUM(table_hit), "
+            "AVG(total_ms), MAX(total_ms) FROM results WHERE run=? GROUP BY route ORDER BY COUNT(*) DESC",
+            (run,),
+        ).fetchall():
+            routes[route or "-"] = {
+                "results": n,
+                "error_rate": (err or 0) / n,
+                "verification_failed_rate": (fail or 0) / n,
+                "table_hit_rate": (hits or 0) / n,
+                "mean_ms": avg,
+                "p95_ms": self._percentile(run, 0.95, route),
+                "max_ms": worst,
+            }
+        stage_avgs = c.execute(
+            "SELECT " + ", ".join(f"AVG({col})" for col in STAGE_COLUMNS.values()) + " FROM results WHERE run=?",
+            (run,),
+        ).fetchone()
+        verification = dict(c.execute(
+            "SELECT COALESCE(NULLIF(verification, ''), '-'), COUNT(*) FROM results WHERE run=? GROUP BY 1", (run,)
+        ).fetchall())
+        return {
+            "run": run,
+            "results": total,
+            "error_rate": (errors or 0) / total if total else 0.0,
+            "verification": verification,
+            "verification_failed_rate": (failed or 0) / total if total else 0.0,
+            "table_hit_rate": (table_hits or 0) / total if total else 0.0,
+            "parse_cache_hit_rate": (parse_hits or 0) / total if total else 0.0,
+            "latency_ms": {
+                "mean": mean_ms,
+                "p50": self._percentile(run, 0.50),
+                "p95": self._percentile(run, 0.95),
+                "p99": self._percentile(run, 0.99),
+                "max": max_ms,
+            },
+            "stage_mean_ms": dict(zip(STAGE_COLUMNS, stage_avgs)),
+            "routes": routes,
+        }
+
+    def slowest(self, run: Optional[str] = None, limit: int = 20) -> Iterator[Dict[str, object]]:
+        run = run or self.latest_run()
+        cur = self._conn.execute(
+            "SELECT idx, route, total_ms, solver_ms, verification, prompt FROM results "
+            "WHERE run=? AND total_ms IS NOT NULL ORDER BY total_ms DESC LIMIT ?",
+            (run, limit),
+        )
+        keys = ("idx", "route", "total_ms", "solver_ms", "verification", "prompt")
+        for row in cur:
+            yield dict(zip(keys, row))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Query a batch results store")
+    ap.add_argument("db")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("runs", help="list runs")
+    s = sub.add_parser("summary", help="aggregate statistics of a run")
+    s.add_argument("--run", default=None, help="run id (default: latest)")
+    s = sub.add_parser("slowest", help="slowest prompts of a run")
+    s.add_argument("--run", default=None)
+    s.add_argument("--limit", type=int, default=20)
+    s = sub.add_parser("sql", help="run a read-only SQL query and print tab-separated rows")
+    s.add_argument("query")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "sql":
+        conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+        cur = conn.execute(args.query)
+        print("\t".join(d[0] for d in cur.description or ()))
+        for row in cur:
+            print("\t".join("" if v is None else str(v) for v in row))
+        conn.close()
+        return
+
+    store = ResultsStore(args.db)
+    try:
+        if args.cmd == "runs":
+            for r in store.runs():
+                print(f"{r['run']}\t{r['results']}\t{r['source']}")
+        elif args.cmd == "summary":
+            print(json.dumps(store.summary(args.run), indent=2))
+        elif args.cmd == "slowest":
+            for r in store.slowest(args.run, args.limit):
+                print(f"{r['total_ms']:>10.1f} ms  {r['route'] or '-':<10} {r['verification'] or '-':<8} {r['prompt']}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
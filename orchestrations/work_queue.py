@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+"""Durable SQLite work queue for distributed batch runs.
+
+A coordinator enqueues prompts as a batch; any number of worker processes,
+on any number of nodes sharing the database file, lease jobs one at a time,
+heartbeat while solving, and store the result. A lease that is not renewed
+(crashed or partitioned worker) expires and the job is handed to another
+worker, up to `max_attempts`; solver exceptions are retried the same way.
+
+No outside services are needed. WAL journaling needs shared memory that all
+processes see, so it is only safe when every worker runs on the same host;
+for workers on several nodes sharing the file over a network filesystem,
+open the queue with wal=False (rollback journal), or `--no-wal` on the CLI.
+"""
+
+import json
+import multiprocessing as mp
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from orchestrations.workers import MemoryGovernor, MemoryPolicy
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch TEXT PRIMARY KEY,
+    source TEXT,
+    total INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    batch TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    prompt TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, lease_expires);
+CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch, idx);
+"""
+
+
+@dataclass(frozen=True)
+class Job:
+    id: int
+    batch: str
+    idx: int
+    prompt: str
+    attempts: int
+
+
+class WorkQueue:
+    """Lease-based job queue stored in a single SQLite file.
+
+    Usage:
+        q = WorkQueue("queue.db")
+        batch = q.enqueue(["Compute ∫_0^1 x^2 dx"])
+        job = q.claim("worker-1")
+        q.complete(job.id, "worker-1", {"final_writeup": "..."})
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60.0, max_attempts: int = 3, wal: bool = True) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()  # the heartbeat thread shares this connection
+        # The journal mode is stored in the file, so switch back explicitly.
+        self._conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _write(self, sql: str, params: tuple = ()) -> int:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def enqueue(self, prompts: Iterable[str], batch: Optional[str] = None, source: str = "") -> str:
+        """Add prompts as one batch; returns the batch id."""
+        batch = batch or f"batch-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        rows = [(batch, i, p, time.time()) for i, p in enumerate(prompts)]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO batches (batch, source, total, created) VALUES (?, ?, ?, ?)",
+                    (batch, source, len(rows), time.time()),
+                )
+                self._conn.executemany(
+                    "INSERT INTO jobs (batch, idx, prompt, updated) VALUES (?, ?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return batch
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """Lease the oldest available job (queued, or leased with an expired lease)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Expired leases that used up their attempts are abandoned, not re-run.
+                self._conn.execute(
+                    "UPDATE jobs SET status='failed', error='lease expired', updated=? "
+                    "WHERE status='leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, now, self.max_attempts),
+                )
+                row = self._conn.execute(
+                    "SELECT id, batch, idx, prompt, attempts FROM jobs "
+                    "WHERE status='queued' OR (status='leased' AND lease_expires < ?) "
+                    "ORDER BY id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status='leased', worker=?, lease_expires=?, attempts=attempts+1, updated=? "
+                    "WHERE id=?",
+                    (worker, now + self.lease_seconds, now, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Job(id=row[0], batch=row[1], idx=row[2], prompt=row[3], attempts=row[4] + 1)
+
+    def heartbeat(self, job_id: int, worker: str) -> bool:
+        """Extend the lease; False if the job is no longer leased to `worker`."""
+        now = time.time()
+        return self._write(
+            "UPDATE jobs SET lease_expires=?, updated=? WHERE id=? AND worker=? AND status='leased'",
+            (now + self.lease_seconds, now, job_id, worker),
+        ) == 1
+
+    def complete(self, job_id: int, worker: str, result: Dict[str, object]) -> bool:
+        return self._write(
+            "UPDATE jobs SET status='done', result=?, error=NULL, lease_expires=NULL, updated=? "
+            "WHERE id=? AND worker=? AND status='leased'",
+            (json.dumps(result, default=str), time.time(), job_id, worker),
+        ) == 1
+
+    def fail(self, job_id: int, worker: str, error: str) -> bool:
+        """Record a failure; the job is re-queued until it reaches max_attempts."""
+        return self._write(
+            "UPDATE jobs SET status=CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "error=?, lease_expires=NULL, updated=? WHERE id=? AND worker=? AND status='leased'",
+            (self.max_attempts, error, time.time(), job_id, worker),
+        ) == 1
+
+    def progress(self, batch: str) -> Dict[str, int]:
+        counts = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE batch=? GROUP BY status", (batch,)
+            ).fetchall()
+        counts.update({status: n for status, n in rows})
+        return counts
+
+    def pending(self) -> int:
+        """Jobs of any batch that are queued or leased."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'leased')"
+            ).fetchone()[0]
+
+    def finished(self, batch: str) -> bool:
+        p = self.progress(batch)
+        return p["queued"] == 0 and p["leased"] == 0
+
+    def wait(self, batch: str, poll: float = 2.0, timeout: Optional[float] = None) -> bool:
+        """Block until every job of `batch` is done or failed; False on timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        while not self.finished(batch):
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(poll)
+        return True
+
+    def results(self, batch: str, page: int = 500) -> Iterator[Dict[str, object]]:
+        """Jobs of `batch` in prompt order: idx, prompt, status, result, error.
+        Read `page` rows at a time, so a large batch is never held in memory."""
+        last = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT idx, prompt, status, result, error FROM jobs WHERE batch=? AND idx>? ORDER BY idx LIMIT ?",
+                    (batch, last, page),
+                ).fetchall()
+            for idx, prompt, status, result, error in rows:
+                yield {
+                    "idx": idx,
+                    "prompt": prompt,
+                    "status": status,
+                    "result": json.loads(result) if result else {},
+                    "error": error,
+                }
+            if len(rows) < page:
+                return
+            last = rows[-1][0]
+
+
+def _default_factory():
+    from orchestrations.pipeline import build_root_agent
+
+    return build_root_agent()
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def run_worker(
+    path: str,
+    worker: Optional[str] = None,
+    agent_factory: Callable = _default_factory,
+    policy: Optional[MemoryPolicy] = None,
+    idle_exit: Optional[float] = None,
+    poll: float = 1.0,
+    lease_seconds: float = 60.0,
+    max_attempts: int = 3,
+    wal: bool = True,
+) -> int:
+    """Claim and solve jobs until the memory policy retires this worker or the
+    queue has been empty for `idle_exit` seconds. Returns the number of jobs run.
+    """
+    worker = worker or default_worker_id()
+    queue = WorkQueue(path, lease_seconds=lease_seconds, max_attempts=max_attempts, wal=wal)
+    governor = MemoryGovernor(policy or MemoryPolicy())
+    agent = agent_factory()
+    served = 0
+    idle_since = time.time()
+    try:
+        while True:
+            job = queue.claim(worker)
+            if job is None:
+                if idle_exit is not None and time.time() - idle_since >= idle_exit:
+                    return served
+                time.sleep(poll)
+                continue
+            stop = threading.Event()
+
+            def beat(job_id: int = job.id) -> None:
+                while not stop.wait(lease_seconds / 3):
+                    queue.heartbeat(job_id, worker)  # type: ignore[arg-type]
+
+            heart = threading.Thread(target=beat, daemon=True)
+            heart.start()
+            try:
+                state = agent.run(job.prompt, {"session_id": f"queue-{job.batch}"})
+                solver = state.get("solver_output", {})
+                queue.complete(job.id, worker, {
+                    "final_writeup": state.get("final_writeup", ""),
+                    "verification_report": state.get("verification_report", {}),
+                    "route": solver.get("route", ""),
+                    "final_answer": solver.get("final_answer", ""),
+                    "source": solver.get("source", ""),
+                    "parse_cache_hit": solver.get("parse_cache_hit"),
+                    "stage_timings": state.get("stage_timings", {}),
+                })
+            except Exception as exc:  # noqa: BLE001 - recorded and retried
+                queue.fail(job.id, worker, str(exc))
+            finally:
+                stop.set()
+                heart.join()
+            served += 1
+            idle_since = time.time()
+            if governor.after_request()["retire"]:
+                return served
+    finally:
+        queue.close()
+
+
+def _worker_process(path: str, policy: MemoryPolicy, idle_exit: Optional[float], lease_seconds: float, wal: bool) -> None:
+    run_worker(path, policy=policy, idle_exit=idle_exit, lease_seconds=lease_seconds, wal=wal)
+
+
+def serve_workers(
+    path: str,
+    num_workers: int = 1,
+    policy: Optional[MemoryPolicy] = None,
+    idle_exit: Optional[float] = 30.0,
+    lease_seconds: float = 60.0,
+    wal: bool = True,
+) -> None:
+    """Keep `num_workers` local worker processes running against the queue,
+    replacing recycled ones, until all of them exit idle.
+    """
+    policy = policy or MemoryPolicy()
+    ctx = mp.get_context()
+
+    def spawn() -> mp.Process:
+        p = ctx.Process(target=_worker_process, args=(path, policy, idle_exit, lease_seconds, wal))
+        p.start()
+        return p
+
+    procs = [spawn() for _ in range(max(1, num_workers))]
+    queue = WorkQueue(path, wal=wal)
+    try:
+        while procs:
+            time.sleep(0.5)
+            for p in list(procs):
+                if p.is_alive():
+                    continue
+                procs.remove(p)
+                # Recycled workers are replaced while work remains; idle ones are not.
+                if queue.pending():
+                    procs.append(spawn())
+    finally:
+        queue.close()
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+"""Worker supervision and memory governance for long-running runs.
+
+SymPy's global cache and the module-level RAG model/index only ever grow in a
+long-lived process. Each worker here runs the pipeline in its own process and,
+after every request, consults a MemoryGovernor that clears SymPy caches past a
+soft RSS limit and retires the worker past a hard RSS limit or request budget.
+Past the soft limit, caches are cleared again only once RSS has grown by a
+further margin, so a process whose baseline sits above the limit does not
+clear (and rebuild) its caches on every request.
+Retirement is a graceful drain: the worker finishes its current request, stops
+taking new ones and exits; the supervisor spawns a fresh replacement.
+"""
+
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sympy.core.cache import clear_cache
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            resident_pages = int(fh.read().split()[1])
+        return resident_pages * _PAGE_SIZE / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and KiB elsewhere
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except Exception:  # noqa: BLE001
+        return 0.0
+
+
+@dataclass
+class MemoryPolicy:
+    """Thresholds for cache clearing and worker recycling (0 disables a limit).
+
+    After a clear, the next one waits until RSS exceeds the post-clear RSS by
+    `cache_clear_growth_mb` (0 clears on every request past the soft limit).
+    """
+
+    max_requests: int = 1000
+    cache_clear_rss_mb: float = 768.0
+    recycle_rss_mb: float = 1536.0
+    cache_clear_growth_mb: float = 128.0
+
+
+@dataclass
+class MemoryGovernor:
+    """Per-process bookkeeping: request count, RSS, cache clears and retirement."""
+
+    policy: MemoryPolicy = field(default_factory=MemoryPolicy)
+    requests: int = 0
+    cache_clears: int = 0
+    rss_mb: float = 0.0
+    peak_rss_mb: float = 0.0
+    rss_after_clear_mb: float = 0.0
+
+    def after_request(self) -> Dict[str, object]:
+        """Record one served request and apply the policy.
+
+        Returns a metrics dict including "retire": True when the caller should
+        drain and exit after the current request.
+        """
+        self.requests += 1
+        self.rss_mb = current_rss_mb()
+        cleared = False
+        if self.policy.cache_clear_rss_mb and self.rss_mb >= self.policy.cache_clear_rss_mb and (
+            not self.cache_clears or self.rss_mb >= self.rss_after_clear_mb + self.policy.cache_clear_growth_mb
+        ):
+            clear_cache()
+            self.cache_clears += 1
+            cleared = True
+            self.rss_mb = self.rss_after_clear_mb = current_rss_mb()
+        self.peak_rss_mb = max(self.peak_rss_mb, self.rss_mb)
+        retire = bool(
+            (self.policy.max_requests and self.requests >= self.policy.max_requests)
+            or (self.policy.recycle_rss_mb and self.rss_mb >= self.policy.recycle_rss_mb)
+        )
+        return {
+            "requests": self.requests,
+            "rss_mb": round(self.rss_mb, 1),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "cache_cleared": cleared,
+            "cache_clears": self.cache_clears,
+            "retire": retire,
+        }
+
+
+def _default_factory():
+    from orchestrations.pipeline import build_root_agent
+
+    return build_root_agent()
+
+
+def _worker_main(worker_id: int, factory: Callable, policy: MemoryPolicy, inbox, results) -> None:
+    agent = factory()
+    governor = MemoryGovernor(policy)
+    while True:
+        item = inbox.get()
+        if item is None:
+            return
+        idx, text, state = item
+        try:
+            out: Dict[str, object] = {"status": "ok", "state": agent.run(text, state)}
+        except Exception as exc:  # noqa: BLE001 - reported back to the supervisor
+            out = {"status": "error", "message": str(exc)}
+        metrics = governor.after_request()
+        results.put(("done", worker_id, idx, out, metrics))
+        if metrics["retire"]:
+            return
+
+
+@dataclass
+class _WorkerRecord:
+    process: mp.Process
+    pid: int
+    generation: int
+    inbox: object
+    in_flight: Optional[int] = None
+    metrics: Dict[str, object] = field(default_factory=dict)
+    exited_at: Optional[float] = None
+
+
+class WorkerSupervisor:
+    """Runs prompts over a pool of recyclable pipeline worker processes.
+
+    The supervisor hands each worker one task at a time through its own inbox,
+    so it always knows which task a crashed worker held. After
+    `max_consecutive_crashes` crashes without a completed task in between
+    (e.g. the agent factory itself fails), the remaining tasks are failed
+    instead of spawning workers forever. A worker that exits cleanly but whose
+    result never arrives within `exit_grace` seconds counts as a crash too.
+
+    Usage:
+        sup = WorkerSupervisor(num_workers=4, policy=MemoryPolicy(max_requests=200))
+        states = sup.map(prompts, state={"session_id": "s"})
+        for idx, result in sup.imap_unordered(prompts): ...  # as each completes
+        sup.metrics()
+    """
+
+    def __init__(
+        self,
+        num_workers: int = 2,
+        policy: Optional[MemoryPolicy] = None,
+        agent_factory: Callable = _default_factory,
+        max_task_retries: int = 1,
+        poll_interval: float = 0.5,
+        max_consecutive_crashes: Optional[int] = None,
+        exit_grace: Optional[float] = None,
+    ) -> None:
+        self.num_workers = max(1, int(num_workers))
+        self.policy = policy or MemoryPolicy()
+        self.agent_factory = agent_factory
+        self.max_task_retries = max_task_retries
+        self.poll_interval = poll_interval
+        self.max_consecutive_crashes = max_consecutive_crashes or 2 * self.num_workers + 1
+        self.exit_grace = 2 * poll_interval if exit_grace is None else exit_grace
+        self._ctx = mp.get_context()
+        self._workers: Dict[int, _WorkerRecord] = {}
+        self._next_id = 0
+        self._recycled = 0
+        self._crashed = 0
+        self._served = 0
+        self._history: Dict[int, Dict[str, object]] = {}
+
+    def _spawn(self, results, generation: int = 0) -> _WorkerRecord:
+        wid = self._next_id
+        self._next_id += 1
+        inbox = self._ctx.SimpleQueue()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(wid, self.agent_factory, self.policy, inbox, results),
+            # Not daemonic: the pipeline forks its own children (ODE hint workers).
+            # imap_unordered() always ends in shutdown(), which stops and joins every worker.
+            daemon=False,
+        )
+        proc.start()
+        rec = _WorkerRecord(process=proc, pid=proc.pid or 0, generation=generation, inbox=inbox)
+        self._workers[wid] = rec
+        return rec
+
+    def _reap(self, wid: int) -> None:
+        rec = self._workers.pop(wid)
+        rec.process.join(timeout=5)
+        if rec.process.is_alive():
+            rec.process.terminate()
+            rec.process.join()
+        self._history[wid] = {
+            "worker_id": wid,
+            "pid": rec.pid,
+            "generation": rec.generation,
+            "alive": False,
+            **rec.metrics,
+        }
+
+    def map(self, prompts: Iterable[str], state: Optional[Dict[str, object]] = None) -> List[Dict[str, object]]:
+        """Run every prompt and return results in input order.
+
+        Each result is {"status": "ok", "state": {...}} or {"status": "error", "message": ...}.
+        """
+        items = list(prompts)
+        out: List[Dict[str, object]] = [{}] * len(items)
+        for idx, result in self.imap_unordered(items, state):
+            out[idx] = result
+        return out
+
+    def imap_unordered(
+        self, prompts: Iterable[str], state: Optional[Dict[str, object]] = None
+    ) -> Iterator[Tuple[int, Dict[str, object]]]:
+        """Run every prompt, yielding (index, result) as each one completes.
+
+        Results arrive in completion order, tagged with the prompt's index, so a
+        caller can store them before the batch ends. Workers are shut down when
+        the batch finishes or the caller stops iterating.
+        """
+        items = list(prompts)
+        base_state = {} if state is None else dict(state)
+        results = self._ctx.Queue()
+        finished = [False] * len(items)
+        attempts = [0] * len(items)
+        backlog = deque(range(len(items)))
+        crash_streak = 0
+
+        def dispatch(rec: _WorkerRecord) -> None:
+            if backlog:
+                idx = backlog.popleft()
+                rec.in_flight = idx
+                rec.inbox.put((idx, items[idx], base_state))  # type: ignore[attr-defined]
+
+        def fill(generation: int = 0) -> None:
+            while backlog and len(self._workers) < self.num_workers:
+                dispatch(self._spawn(results, generation))
+
+        pending = len(items)
+        try:
+            fill()
+            while pending:
+                try:
+                    kind, wid, idx, payload, metrics = results.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    failed: List[Tuple[int, Dict[str, object]]] = []
+                    for wid, rec in list(self._workers.items()):
+                        if rec.process.is_alive():
+                            continue
+                        if rec.process.exitcode == 0:
+                            # A retirement whose "done" message may still be in flight; past
+                            # the grace period it is never coming, so treat it as a crash.
+                            now = time.monotonic()
+                            rec.exited_at = rec.exited_at or now
+                            if now - rec.exited_at < self.exit_grace:
+                                continue
+                        # Died without reporting its task (OOM kill, failing factory): retry the task.
+                        lost = rec.in_flight
+                        self._reap(wid)
+                        self._crashed += 1
+                        crash_streak += 1
+                        if lost is not None and not finished[lost]:
+                            attempts[lost] += 1
+                            if attempts[lost] > self.max_task_retries:
+                                failed.append((lost, {
+                                    "status": "error",
+                                    "message": f"worker exited with code {rec.process.exitcode}",
+                                }))
+                            else:
+                                backlog.appendleft(lost)
+                        if crash_streak >= self.max_consecutive_crashes:
+                            message = f"{crash_streak} consecutive worker crashes (last exit code {rec.process.exitcode})"
+                            failing = {i for i, _ in failed}
+                            failed.extend(
+                                (i, {"status": "error", "message": message})
+                                for i, done in enumerate(finished)
+                                if not done and i not in failing
+                            )
+                            backlog.clear()
+                            break
+                        fill(rec.generation + 1)
+                    for i, result in failed:
+                        finished[i] = True
+                        pending -= 1
+                        yield i, result
+                    continue
+                crash_streak = 0
+                rec = self._workers.get(wid)
+                if rec is not None:
+                    rec.in_flight = None
+                    rec.metrics = dict(metrics or {})
+                    if rec.metrics.get("retire"):
+                        # Graceful drain: the worker has already stopped taking tasks.
+                        self._reap(wid)
+                        self._recycled += 1
+                        fill(rec.generation + 1)
+                    else:
+                        dispatch(rec)
+                if not finished[idx]:
+                    finished[idx] = True
+                    pending -= 1
+                    self._served += 1
+                    yield idx, payload
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stop all workers once they finish their current request."""
+        for rec in self._workers.values():
+            if rec.process.is_alive():
+                rec.inbox.put(None)  # type: ignore[attr-defined]
+        for wid in list(self._workers):
+            self._reap(wid)
+
+    def metrics(self) -> Dict[str, object]:
+        """Aggregate memory and recycling metrics for reporting."""
+        workers = dict(self._history)
+        for wid, rec in self._workers.items():
+            workers[wid] = {"worker_id": wid, "pid": rec.pid, "generation": rec.generation, "alive": True, **rec.metrics}
+        peaks = [float(w.get("peak_rss_mb", 0.0)) for w in workers.values()]  # type: ignore[arg-type]
+        return {
+            "served": self._served,
+            "recycled": self._recycled,
+            "crashed": self._crashed,
+            "peak_rss_mb": max(peaks, default=0.0),
+            "workers": [workers[k] for k in sorted(workers)],
+        }
@@ -0,0 +1,56 @@
+import json
+
+from benchmarks.loadgen import Sample, compare, parse_mix, replay_arrivals, summarize, synthetic_prompts
+
+
+def test_replay_keeps_gaps_scaled_by_speed(tmp_path):
+    log = tmp_path / "log.jsonl"
+    log.write_text("\n".join(json.dumps({"prompt": f"p{i}", "ts": 100 + 2 * i}) for i in range(3)))
+    assert [a.offset for a in replay_arrivals(str(log), speed=2)] == [0.0, 1.0, 2.0]
+
+
+def test_synthetic_mix_is_seeded():
+    mix = parse_mix("integral=1,solve=1")
+    a, b = synthetic_prompts(mix, seed=3), synthetic_prompts(mix, seed=3)
+    assert [next(a) for _ in range(5)] == [next(b) for _ in range(5)]
+
+
+def test_summary_and_compare():
+    samples = [Sample(0.0, 0.1, "ok", "solve", "passed", {"MathSolverAgent": 0.08}),
+               Sample(0.1, 0.3, "ok", "integral", "passed", {"MathSolverAgent": 0.25}),
+               Sample(0.2, 1.0, "error", error="boom")]
+    summary = summarize(samples, wall=1.0)
+    assert summary["throughput_rps"] == 2.0
+    assert abs(summary["error_rate"] - 1 / 3) < 1e-9
+    assert "MathSolverAgent" in summary["stages"]
+    slower = dict(summary, throughput_rps=1.0)
+    rows = {r["metric"]: r for r in compare({"summary": summary}, {"summary": slower})}
+    assert rows["throughput_rps"]["better"] is False
+    assert rows["latency p95"]["better"] is None
+
+
+def test_http_target_posts_body_key_and_reads_nested_state():
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    from benchmarks.loadgen import http_target
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            reply = json.dumps({"state": {"solver_output": {"route": "solve"}, "echo": body}}).encode()
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(reply)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        state = http_target(f"http://127.0.0.1:{server.server_port}/run")("x + x", 5.0)
+    finally:
+        server.shutdown()
+    assert state["echo"] == {"input": "x + x"}
+    assert state["solver_output"]["route"] == "solve"
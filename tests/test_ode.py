@@ -0,0 +1,67 @@
+from sympy import exp, simplify, symbols
+
+from agents.solver import MathSolverAgent
+from tools.ode import solve_ode
+from tools.parser import parse_expr
+
+
+def test_solve_ode_with_initial_conditions():
+    res = solve_ode("y'' - y = 0", ics=["y(0)=1", "y'(0)=0"])
+    assert res["status"] == "ok"
+    assert res["general_str"] == "y(x) = C1*exp(-x) + C2*exp(x)"
+    assert all(c["passed"] for c in res["checks"])
+    x = symbols("x")
+    rhs = parse_expr(res["solution_str"].split("=", 1)[1])
+    assert simplify(rhs - (exp(x) + exp(-x)) / 2) == 0
+
+
+def test_solve_ode_other_variable_and_errors():
+    res = solve_ode("x'' + x = 0", var="t", ics=["x(0)=0", "x'(0)=1"])
+    assert res["solution_str"] == "x(t) = sin(t)"
+    assert solve_ode("y + 1")["status"] == "error"
+
+
+def test_solver_routes_demo_prompt():
+    state = MathSolverAgent().run(
+        "Find the general solution to y'' - y = 0 and verify initial conditions y(0)=1, y'(0)=0"
+    )
+    out = state["solver_output"]
+    assert out["route"] == "ode"
+    assert out["final_answer"].startswith("y(x) = ")
+    assert len(out["checks"]) == 3 and all(c["passed"] for c in out["checks"])
+
+
+def test_diff_call_form_routes_to_ode():
+    out = MathSolverAgent().run("diff(y(x), x) = y(x)")["solver_output"]
+    assert out["route"] == "ode"
+    assert out["final_answer"] == "y(x) = C1*exp(x)"
+
+
+def test_ode_inside_supervised_worker():
+    from orchestrations.workers import WorkerSupervisor
+
+    sup = WorkerSupervisor(num_workers=1, poll_interval=0.1)
+    (res,) = sup.map(["Find the general solution to y'' - y = 0 and verify initial conditions y(0)=1, y'(0)=0"])
+    assert res["status"] == "ok"
+    out = res["state"]["solver_output"]
+    assert out["route"] == "ode" and out["final_answer"].startswith("y(x) = ")
+
+
+def test_solve_ode_respects_timeout():
+    import time
+
+    start = time.perf_counter()
+    res = solve_ode("y' = y^2 sin(x) + x", timeout=0.5)
+    assert time.perf_counter() - start < 1.5
+    assert res["status"] == "ok" or "0.5s" in res["message"]
+
+
+def test_planner_plans_ode_only_for_primes():
+    from agents.planner import PlannerAgent
+
+    def steps(text):
+        return [s["step"] for s in PlannerAgent().run(text)["plan_json"]["steps"]]
+
+    assert "Solve ODE" in steps("Solve y'' - y = 0")
+    assert "Solve ODE" not in steps("What's 2+2?")
+    assert "Solve ODE" not in steps("I'm stuck on x^2 = 4")
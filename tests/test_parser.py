@@ -0,0 +1,70 @@
+import pytest
+from sympy import E, Eq, Integral, Limit, Sum, Symbol, oo, pi, sin, sqrt, symbols
+
+from tools.parser import ParseError, cache_info, extract, parse
+
+
+x, n = symbols("x n")
+
+
+def test_plain_and_implicit_multiplication():
+    assert parse("x^2 - 5x + 6 = 0") == Eq(x**2 - 5 * x + 6, 0)
+    assert parse("2(x+1)") == 2 * x + 2
+    assert parse("2πr") == 2 * pi * Symbol("r")
+    assert parse("sin(x)^2 + cos(x)**2") == parse("\\sin^2 x + \\cos^2 x")
+    with pytest.raises(ParseError):
+        parse("x y")
+
+
+def test_letter_before_parenthesis_multiplies_unless_used_as_function():
+    assert parse("x(x-2) = 0") == Eq(x * (x - 2), 0)
+    assert parse("2x(x-3)") == 2 * x * (x - 3)
+    assert parse("e(x+1)") == E * (x + 1)
+    y = parse("y(0) = 1").lhs
+    assert y.func.__name__ == "y" and y.args == (0,)
+    assert parse("y'' + y(x) = 0").lhs.has(parse("y(0) = 1").lhs.func(x))
+    f = parse("diff(f(x + 1), x)").args[0]
+    assert f.func.__name__ == "f" and f.args == (x + 1,)
+    assert parse("y(x)").func.__name__ == "y"
+
+
+def test_unicode_and_latex_forms():
+    assert parse("∫_0^1 x^2 dx") == Integral(x**2, (x, 0, 1))
+    assert parse(r"\int_{0}^{\infty} e^{-x} \, \mathrm{d}x") == Integral(E**-x, (x, 0, oo))
+    assert parse("∑_{n=1}^{∞} 1/n^2") == Sum(1 / n**2, (n, 1, oo))
+    assert parse(r"\lim_{x \to 0} \frac{\sin x}{x}") == Limit(sin(x) / x, x, 0)
+    assert parse("√(x+1)") == sqrt(x + 1)
+
+
+def test_call_forms_with_nested_commas():
+    assert parse('integrate("x**2", "x", ("x", 0, 1))') == Integral(x**2, (x, 0, 1))
+    assert parse("limit((1+1/n)**n, n, oo)") == Limit((1 + 1 / n) ** n, n, oo)
+
+
+def test_extract_from_sentence_and_memoization():
+    assert extract("Compute ∫_0^1 x^2 dx") == Integral(x**2, (x, 0, 1))
+    assert extract("Solve x^2 = 4 for x") == Eq(x**2, 4)
+    before = cache_info().hits
+    parse("x^2 - 5x + 6 = 0")
+    assert cache_info().hits == before + 1
+
+
+@pytest.mark.parametrize("prompt", [
+    "Compute the derivative of sin(x)",
+    "Differentiate x^3 with respect to x",
+    "Find the area of a circle of radius 2",
+])
+def test_unparsed_math_outside_the_span_is_not_answered(prompt):
+    from agents.solver import MathSolverAgent, parse_problem
+
+    assert parse_problem(prompt) is None
+    out = MathSolverAgent().run(prompt)["solver_output"]
+    assert out["final_answer"] == "" and out["derivation_steps"] == [r"\text{Unable to parse problem}"]
+
+
+def test_lone_letter_times_constant_or_function():
+    assert parse("x e^x") == x * E**x
+    assert parse("x sin(x)") == x * sin(x)
+    assert extract("Compute ∫_0^1 x e^x dx", strict=True) == Integral(x * E**x, (x, 0, 1))
+    with pytest.raises(ParseError):
+        extract("Compute ∫_0^1 x ?? dx", strict=True)
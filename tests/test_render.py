@@ -0,0 +1,35 @@
+import json
+
+from tools.render import Renderer, render_writeup
+
+
+STATE = {
+    "plan_json": {"steps": [{"step": "Compute limit", "tool": "sympy.limit"}]},
+    "solver_output": {
+        "derivation_steps": [r"\lim_{x \to 0} \frac{\sin{x}}{x} = 1"],
+        "final_answer": "exp(2)",
+        "final_latex": "e^{2}",
+    },
+    "verification_report": {"status": "passed", "details": ["Numeric evaluation: 7.389"]},
+}
+
+
+def test_markdown_keeps_report_layout():
+    md = render_writeup(STATE)
+    assert md.endswith("### Final Answer\n\\boxed{exp(2)}")
+    assert "### Verification\n**Status:** passed" in md
+
+
+def test_html_and_json_reuse_upstream_latex():
+    assert r"\boxed{e^{2}}" in render_writeup(STATE, "html")
+    data = json.loads(render_writeup(STATE, "json"))
+    assert data["answer"]["latex"] == "e^{2}" and data["verification"]["status"] == "passed"
+
+
+def test_incremental_feed_only_renders_changed_stages():
+    r = Renderer()
+    assert r.feed({"plan_json": STATE["plan_json"]}) == ["plan"]
+    assert r.render().endswith("\\boxed{}")
+    partial = dict(STATE)
+    assert r.feed(partial) == ["derivation", "answer", "verification"]
+    assert r.feed(partial) == []
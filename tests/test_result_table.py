@@ -0,0 +1,83 @@
+from sympy import integrate, limit, series, simplify, solve, sympify, Symbol
+
+from agents.solver import MathSolverAgent
+from agents.verifier import VerifierAgent
+from tools.result_table import ResultTable, answer_latex, answers_match, build_from_reports, seed_table
+
+
+def test_seed_entries_agree_with_sympy():
+    for e in seed_table():
+        expr = sympify(e.expr)
+        args = [sympify(a) for a in e.args]
+        v = Symbol(e.var) if e.var else None
+        if e.kind == "integral":
+            got = integrate(expr, (v, *args)) if args else integrate(expr, v)
+        elif e.kind == "limit":
+            got = limit(expr, v, args[0])
+        elif e.kind == "series":
+            got = series(expr, v, *args)
+        elif e.kind == "solve":
+            got = "{" + ", ".join(str(s) for s in solve(expr, v)) + "}"
+        else:
+            got = simplify(expr)
+        assert answers_match(str(got), e.result), e
+
+
+def test_lookup_is_canonical_over_variable_names():
+    table = seed_table()
+    assert table.lookup("integral", "t**2", "t", (0, 1)).result == "1/3"
+    assert table.lookup("solve", "6 - 5*y + y**2", "y").result == "{2, 3}"
+    assert table.lookup("integral", "t**3", "t", (0, 1)) is None
+
+
+def test_solver_consults_table_and_verifier_checks_oracle():
+    state = MathSolverAgent().run("limit((1+1/n)**n, n, oo)")
+    assert state["solver_output"]["source"] == "table"
+    assert state["solver_output"]["final_answer"] == "E"
+
+    wrong = ResultTable()
+    wrong.add("limit", "sin(x)/x", "x", ("0",), "2")
+    state = MathSolverAgent(use_result_table=False).run("limit(sin(x)/x, x, 0)")
+    assert state["solver_output"]["final_answer"] == "1"
+    report = VerifierAgent(result_table=wrong).run("", state)["verification_report"]
+    assert report["status"] == "failed"
+
+
+def test_save_load_and_build_from_reports(tmp_path):
+    report = tmp_path / "report.md"
+    report.write_text(
+        "# Panguan-GPT Report\n\n## Problem\nlimit(sin(3*x)/x, x, 0)\n\n### Final Writeup\n"
+        "### Final Answer\n\\boxed{3}\n\n### Verification\n{'status': 'passed', 'details': []}\n"
+    )
+    built = build_from_reports([str(report)])
+    assert len(built) == 1
+    path = tmp_path / "table.jsonl.gz"
+    built.save(str(path))
+    loaded = ResultTable.load(str(path))
+    assert loaded.lookup("limit", "sin(3*t)/t", "t", ("0",)).result == "3"
+
+
+def test_one_sided_limits_keep_their_direction():
+    left = MathSolverAgent().run(r"\lim_{x \to 0^-} 1/x")["solver_output"]
+    right = MathSolverAgent().run(r"\lim_{x \to 0^+} 1/x")["solver_output"]
+    assert left["final_answer"] == "-oo" and left["problem"]["args"] == ["0", "-"]
+    assert right["final_answer"] == "oo"
+    table = ResultTable()
+    table.add("limit", "1/x", "x", ("0", "-"), "-oo")
+    assert table.lookup("limit", "1/x", "x", ("0", "-")).result == "-oo"
+    assert table.lookup("limit", "1/x", "x", ("0",)) is None
+
+
+def test_limit_call_form_takes_a_direction():
+    for prompt in ("limit(1/x, x, 0, '-')", 'limit(1/x, x, 0, "-")', "limit(1/x, x, 0, dir='-')"):
+        out = MathSolverAgent().run(prompt)["solver_output"]
+        assert out["route"] == "limit" and out["final_answer"] == "-oo", prompt
+    out = MathSolverAgent().run("limit(1/x, x, 0, '1/')")["solver_output"]
+    assert out["final_answer"] == ""
+
+
+def test_table_hit_for_solution_set_renders_set_latex():
+    out = MathSolverAgent().run("Solve x^2 - 5x + 6 = 0")["solver_output"]
+    assert out["source"] == "table"
+    assert out["final_latex"] == r"\left\{2, 3\right\}"
+    assert answer_latex("{-1, 1/2}") == r"\left\{-1, \frac{1}{2}\right\}"
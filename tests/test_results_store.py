@@ -0,0 +1,30 @@
+from orchestrations.results_store import ResultsStore, row_from_state
+
+
+def _state(route, answer, status, solver_s, source="computed"):
+    return {
+        "solver_output": {"route": route, "final_answer": answer, "source": source, "parse_cache_hit": False},
+        "verification_report": {"status": status},
+        "stage_timings": {"PlannerAgent": 0.001, "MathSolverAgent": solver_s},
+    }
+
+
+def test_append_and_summarize(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    run = store.start_run(source="prompts.txt")
+    rows = [
+        row_from_state("Solve x^2 - 1 = 0", _state("solve", "{-1, 1}", "passed", 0.01, "table")),
+        row_from_state("Compute ∫_0^1 x dx", _state("integral", "1/2", "failed", 0.5)),
+        row_from_state("???", {}, "parse error"),
+    ]
+    assert store.append(run, rows, chunk=2) == 3
+
+    summary = store.summary()
+    assert summary["run"] == run and summary["results"] == 3
+    assert abs(summary["error_rate"] - 1 / 3) < 1e-9
+    assert summary["verification"] == {"passed": 1, "failed": 1, "-": 1}
+    assert summary["routes"]["solve"]["table_hit_rate"] == 1.0
+    assert abs(summary["stage_mean_ms"]["MathSolverAgent"] - 255.0) < 1e-6
+    slowest = list(store.slowest(limit=1))
+    assert slowest[0]["route"] == "integral" and slowest[0]["idx"] == 1
+    store.close()
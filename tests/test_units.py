@@ -0,0 +1,51 @@
+import numpy as np
+
+from tools.units import check_dimensions, convert, scaling_check
+
+
+def test_convert_compound_and_offset_units():
+    assert abs(convert(36, "km/h", "m/s")["converted_value"] - 10.0) < 1e-12
+    assert convert(1, "N", "kg*m/s^2")["status"] == "ok"
+    res = convert(np.array([0.0, 100.0]), "degC", "degF")
+    assert np.allclose(res["converted_value"], [32.0, 212.0])
+    assert convert(1, "m", "s")["status"] == "error"
+
+
+def test_check_dimensions():
+    units = {"x": "m", "v": "m/s", "t": "s"}
+    assert check_dimensions("x + v*t", units, "m")["consistent"]
+    bad = check_dimensions("x + v", units)
+    assert not bad["consistent"] and "cannot add" in bad["message"]
+    assert not check_dimensions("sin(t)", units)["consistent"]
+    assert scaling_check("x + v*t", units)["passed"] == 1.0
+
+
+def test_magnitude_functions_keep_dimension_and_unsupported_nodes_error():
+    units = {"x": "m", "y": "m", "v": "m/s", "t": "s"}
+    assert check_dimensions("Abs(x) + v*t", units, "m")["consistent"]
+    assert check_dimensions("Max(x, y) - Min(x, v*t)", units, "m")["consistent"]
+    assert check_dimensions("floor(x) + ceiling(y)", units)["dimension"] == "L"
+    assert not check_dimensions("Max(x, t)", units)["consistent"]
+    assert check_dimensions("diff(x, t)", units)["status"] == "error"
+    assert scaling_check("floor(x)", units)["status"] == "error"
+
+
+def test_declared_names_shadow_constants():
+    energy = check_dimensions("E = m*c^2", {"E": "J", "m": "kg", "c": "m/s"})
+    assert energy["consistent"] and energy["dimension"] == "L^2 M T^-2"
+    ohm = check_dimensions("V = I*R", {"V": "V", "I": "A", "R": "ohm"})
+    assert ohm["consistent"]
+    assert scaling_check("V - I*R", {"V": "V", "I": "A", "R": "ohm"})["passed"] == 1.0
+
+
+def test_verifier_reports_a_mismatch_once():
+    from agents.verifier import VerifierAgent
+
+    state = {
+        "solver_output": {"final_answer": "x + v", "route": "simplify",
+                          "problem": {"kind": "simplify", "expr": "x + v", "var": "", "args": []}},
+        "units": {"x": "m", "v": "m/s"},
+    }
+    report = VerifierAgent().run("", state)["verification_report"]
+    assert report["status"] == "failed"
+    assert sum("Unit mismatch" in d for d in report["details"]) == 1
@@ -0,0 +1,60 @@
+import time
+
+from orchestrations.work_queue import WorkQueue, run_worker
+
+
+class _FlakyAgent:
+    """Raises on its first call, then echoes the prompt."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def run(self, text, state=None):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("boom")
+        return {"final_writeup": f"answer to {text}", "verification_report": {"status": "passed"}}
+
+
+def test_lease_expiry_and_retry(tmp_path):
+    q = WorkQueue(str(tmp_path / "q.db"), lease_seconds=0.05, max_attempts=2)
+    batch = q.enqueue(["a", "b"])
+    job = q.claim("w1")
+    assert job.prompt == "a" and job.attempts == 1
+    time.sleep(0.1)
+    # w1 stopped heartbeating: its job goes to the next worker
+    again = q.claim("w2")
+    assert again.id == job.id and again.attempts == 2
+    assert not q.complete(job.id, "w1", {})
+    assert q.fail(again.id, "w2", "bad")
+    assert q.progress(batch) == {"queued": 1, "leased": 0, "done": 0, "failed": 1}
+
+
+def test_worker_drains_batch_in_order(tmp_path):
+    path = str(tmp_path / "q.db")
+    q = WorkQueue(path)
+    batch = q.enqueue(["p0", "p1", "p2"])
+    served = run_worker(path, worker="w", agent_factory=_FlakyAgent, idle_exit=0, poll=0.01)
+    assert served == 4  # one failure retried
+    assert q.finished(batch)
+    results = list(q.results(batch))
+    assert [r["prompt"] for r in results] == ["p0", "p1", "p2"]
+    assert all(r["status"] == "done" for r in results)
+    assert results[0]["result"]["final_writeup"] == "answer to p0"
+
+
+def test_rollback_journal_without_wal(tmp_path):
+    path = str(tmp_path / "q.db")
+    WorkQueue(path).close()  # created in WAL mode
+    q = WorkQueue(path, wal=False)
+    assert q._conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    batch = q.enqueue(["p0"])
+    assert run_worker(path, worker="w", agent_factory=_FlakyAgent, idle_exit=0, poll=0.01, wal=False) == 2
+    assert q.finished(batch)
+
+
+def test_results_are_read_in_pages(tmp_path):
+    q = WorkQueue(str(tmp_path / "q.db"))
+    batch = q.enqueue([f"p{i}" for i in range(5)])
+    assert [r["idx"] for r in q.results(batch, page=2)] == [0, 1, 2, 3, 4]
+    assert [r["prompt"] for r in q.results(batch, page=5)] == ["p0", "p1", "p2", "p3", "p4"]
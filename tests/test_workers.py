@@ -0,0 +1,69 @@
+import os
+
+from orchestrations.workers import MemoryGovernor, MemoryPolicy, WorkerSupervisor
+
+
+def test_governor_clears_cache_and_retires():
+    gov = MemoryGovernor(
+        MemoryPolicy(max_requests=2, cache_clear_rss_mb=0.001, recycle_rss_mb=0, cache_clear_growth_mb=0)
+    )
+    m1 = gov.after_request()
+    assert m1["cache_cleared"] and not m1["retire"]
+    m2 = gov.after_request()
+    assert m2["retire"] and m2["cache_clears"] == 2
+
+
+def test_governor_waits_for_growth_before_clearing_again():
+    gov = MemoryGovernor(MemoryPolicy(max_requests=0, cache_clear_rss_mb=0.001, cache_clear_growth_mb=1e6))
+    cleared = [gov.after_request()["cache_cleared"] for _ in range(5)]
+    assert cleared == [True, False, False, False, False]
+    gov.rss_after_clear_mb = -1e6  # as if RSS had grown past the margin since the clear
+    assert gov.after_request()["cache_cleared"]
+
+
+def test_supervisor_recycles_workers():
+    sup = WorkerSupervisor(num_workers=2, policy=MemoryPolicy(max_requests=1), poll_interval=0.1)
+    out = sup.map(["Compute ∫_0^1 x^2 dx", "limit((1+1/n)**n, n, oo)", "Compute ∫_0^2 x dx"])
+    assert [r["status"] for r in out] == ["ok", "ok", "ok"]
+    assert out[0]["state"]["solver_output"]["final_answer"] == "1/3"
+    assert out[2]["state"]["solver_output"]["final_answer"] == "2"
+    metrics = sup.metrics()
+    assert metrics["served"] == 3
+    assert metrics["recycled"] == 3
+    assert metrics["peak_rss_mb"] > 0
+
+
+def _broken_factory():
+    raise RuntimeError("cannot build agent")
+
+
+def test_supervisor_gives_up_on_repeated_crashes():
+    sup = WorkerSupervisor(num_workers=2, agent_factory=_broken_factory, poll_interval=0.05)
+    out = sup.map(["x + x", "2*x", "x**2"])
+    assert [r["status"] for r in out] == ["error", "error", "error"]
+    assert sup.metrics()["crashed"] == 5
+
+
+class _SilentExitAgent:
+    def run(self, text, state=None):
+        os._exit(0)  # exits cleanly without ever reporting the task
+
+
+def _silent_exit_factory():
+    return _SilentExitAgent()
+
+
+def test_supervisor_reaps_worker_that_exits_cleanly_without_a_result():
+    sup = WorkerSupervisor(num_workers=1, agent_factory=_silent_exit_factory, poll_interval=0.05)
+    (res,) = sup.map(["x + x"])
+    assert res["status"] == "error" and "code 0" in res["message"]
+    assert sup.metrics()["crashed"] == 2
+
+
+def test_imap_unordered_yields_each_result_with_its_index():
+    sup = WorkerSupervisor(num_workers=2, poll_interval=0.1)
+    prompts = ["Compute ∫_0^1 x^2 dx", "x + x", "Compute ∫_0^2 x dx"]
+    got = dict(sup.imap_unordered(prompts))
+    assert sorted(got) == [0, 1, 2]
+    assert got[1]["state"]["solver_output"]["final_answer"] == "2*x"
+    assert sup.metrics()["workers"] and not any(w["alive"] for w in sup.metrics()["workers"])
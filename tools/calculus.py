@@ -6,23 +6,21 @@ Calculus utilities implemented with SymPy.
 
 from typing import Dict, Optional, Tuple
 
-from sympy import Integral, Symbol, SympifyError, diff, sympify
+from sympy import Symbol, diff
 from sympy import integrate as sympy_integrate
 from sympy.printing.latex import latex as sympy_latex
 
-
-def _normalize(expr: str) -> str:
-    return expr.replace("^", "**")
+from tools.parser import ParseError, parse_expr
 
 
 def differentiate(expr: str, var: str) -> Dict[str, object]:
     """Return derivative wrt `var` with keys: status, latex, derivative_str."""
     try:
-        parsed = sympify(_normalize(expr))
+        parsed = parse_expr(expr)
         symbol = Symbol(var)
         deriv = diff(parsed, symbol)
         return {"status": "ok", "latex": sympy_latex(deriv), "derivative_str": str(deriv)}
-    except (SympifyError, Exception) as exc:  # noqa: BLE001
+    except (ParseError, Exception) as exc:  # noqa: BLE001
         return {"status": "error", "message": str(exc)}
 
 
@@ -36,13 +34,13 @@ def integrate(
     else indefinite. Return: status, latex, result_str, constant_note ("+C" or "").
     """
     try:
-        parsed = sympify(_normalize(expr))
+        parsed = parse_expr(expr)
         symbol = Symbol(var)
         constant_note = ""
         if limits is not None:
             lim_var, a, b = limits
             lim_symbol = Symbol(str(lim_var))
-            result = sympy_integrate(parsed, (lim_symbol, sympify(a), sympify(b)))
+            result = sympy_integrate(parsed, (lim_symbol, parse_expr(a), parse_expr(b)))
         else:
             result = sympy_integrate(parsed, symbol)
             constant_note = "+C"
@@ -52,7 +50,7 @@ def integrate(
             "result_str": str(result),
             "constant_note": constant_note,
         }
-    except (SympifyError, Exception) as exc:  # noqa: BLE001
+    except (ParseError, Exception) as exc:  # noqa: BLE001
         return {"status": "error", "message": str(exc)}
 
 
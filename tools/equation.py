@@ -4,18 +4,16 @@ from __future__ import annotations
 
 from typing import Dict, List
 
-from sympy import Symbol, SympifyError, solve, sympify
+from sympy import Symbol, solve
 from sympy.printing.latex import latex as sympy_latex
 
-
-def _normalize(expr: str) -> str:
-    return expr.replace("^", "**")
+from tools.parser import ParseError, parse_expr
 
 
 def solve_equation(expr: str, var: str) -> Dict[str, object]:
     """Solve expr == 0 for `var`. Return: status, solutions_latex, solutions (JSON-serializable list)."""
     try:
-        parsed = sympify(_normalize(expr))
+        parsed = parse_expr(expr)
         symbol = Symbol(var)
         sols: List[object] = solve(parsed, symbol)
         sols_latex = [sympy_latex(s) for s in sols]
@@ -24,7 +22,7 @@ def solve_equation(expr: str, var: str) -> Dict[str, object]:
             "solutions_latex": sols_latex,
             "solutions": [str(s) for s in sols],
         }
-    except (SympifyError, Exception) as exc:  # noqa: BLE001
+    except (ParseError, Exception) as exc:  # noqa: BLE001
         return {"status": "error", "message": str(exc)}
 
 
@@ -1,12 +1,52 @@
 from __future__ import annotations
 
-"""LaTeX rendering helpers."""
+"""LaTeX rendering helpers.
 
+`to_latex` is memoized, and LaTeX printed upstream (by the solver or tools)
+can be registered with `remember` so it is reused rather than re-parsed and
+re-printed.
+"""
+
+from functools import lru_cache
 from typing import Dict, List, Union
 
-from sympy import SympifyError, sympify
+from sympy import Basic
 from sympy.printing.latex import latex as sympy_latex
 
+from tools.parser import ParseError, parse_expr
+
+
+_KNOWN: Dict[str, str] = {}
+_KNOWN_MAX = 4096
+
+
+def remember(text: str, latex_str: str) -> None:
+    """Record LaTeX already printed for the plain-text expression `text`."""
+    if not text or not latex_str:
+        return
+    if len(_KNOWN) >= _KNOWN_MAX:
+        _KNOWN.clear()
+    _KNOWN[text] = latex_str
+
+
+@lru_cache(maxsize=4096)
+def _print(text: str) -> str:
+    return sympy_latex(parse_expr(text))
+
+
+def to_latex(expr: Union[str, Basic]) -> str:
+    """LaTeX for an expression or its string form; unparsable text is returned as-is."""
+    if isinstance(expr, Basic):
+        return sympy_latex(expr)
+    text = str(expr)
+    known = _KNOWN.get(text)
+    if known is not None:
+        return known
+    try:
+        return _print(text)
+    except (ParseError, Exception):  # noqa: BLE001
+        return text
+
 
 def pretty(expr_or_steps: Union[str, List[str]]) -> Dict[str, object]:
     """
@@ -19,10 +59,9 @@ def pretty(expr_or_steps: Union[str, List[str]]) -> Dict[str, object]:
             lines = [str(s) for s in expr_or_steps]
             block = "\\begin{aligned}\n" + " \\\n".join(lines) + "\n\\end{aligned}"
             return {"status": "ok", "latex_block": block}
-        # Single expression: attempt to sympify and latex it
-        parsed = sympify(str(expr_or_steps))
-        return {"status": "ok", "latex_block": sympy_latex(parsed)}
-    except (SympifyError, Exception) as exc:  # noqa: BLE001
+        # Single expression: reuse known or memoized LaTeX
+        return {"status": "ok", "latex_block": to_latex(expr_or_steps)}
+    except (ParseError, Exception) as exc:  # noqa: BLE001
         # If it is a raw string that cannot be parsed, fall back to raw
         try:
             return {"status": "ok", "latex_block": str(expr_or_steps)}
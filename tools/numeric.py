@@ -4,11 +4,9 @@ from __future__ import annotations
 
 from typing import Dict, Optional
 
-from sympy import N, SympifyError, sympify
+from sympy import N
 
-
-def _normalize(expr: str) -> str:
-    return expr.replace("^", "**")
+from tools.parser import ParseError, parse_expr
 
 
 def evaluate(expr: str, subs: Optional[dict] = None) -> Dict[str, object]:
@@ -17,16 +15,16 @@ def evaluate(expr: str, subs: Optional[dict] = None) -> Dict[str, object]:
     Return: status, float_value (Python float), precision_note.
     """
     try:
-        parsed = sympify(_normalize(expr))
+        parsed = parse_expr(expr)
         if subs:
             # Convert keys to strings/symbols safely
             safe_subs = {}
             for k, v in subs.items():
-                safe_subs[sympify(str(k))] = sympify(v)
+                safe_subs[parse_expr(str(k))] = parse_expr(v)
             parsed = parsed.subs(safe_subs)
         numeric = N(parsed)
         return {"status": "ok", "float_value": float(numeric), "precision_note": "evalf"}
-    except (SympifyError, Exception) as exc:  # noqa: BLE001
+    except (ParseError, Exception) as exc:  # noqa: BLE001
         return {"status": "error", "message": str(exc)}
 
 
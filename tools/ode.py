@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+"""Ordinary differential equations via SymPy's dsolve machinery.
+
+Solving is tiered for interactive latency. SymPy's early-exit classification
+picks dsolve's default hint, which is solved in-process with part of the time
+budget (usually well under a second); in the main thread a timer interrupts it
+at that budget, elsewhere it runs to completion. Only if it fails or overruns
+is the equation classified fully and every hint solved concurrently in forked
+workers, under the remaining deadline; the best-ranked hint that finishes in
+time wins. That fallback runs in its own forked process group, killed at the
+deadline, so one pathological hint cannot stall a request. The common path
+therefore never forks, which keeps it safe in threaded callers. Where fork is
+unavailable (or inside a daemonic worker, which may not have children) hints
+are tried in order in-process, without a deadline.
+
+The tiers use dsolve's internal classification and per-hint solver, which are
+not public API. If a SymPy release moves them, solve_ode falls back to the
+public classify_ode and dsolve under the same deadline, so SymPy is not pinned.
+"""
+
+import multiprocessing as mp
+import os
+import re
+import signal
+import threading
+import time
+from multiprocessing.connection import wait
+from typing import Dict, List, Optional, Sequence, Union
+
+from sympy import Basic, Derivative, Eq, Equality, Function, Lambda, Symbol, checkodesol, classify_ode, dsolve
+from sympy.core.function import AppliedUndef
+from sympy.printing.latex import latex as sympy_latex
+
+try:
+    from sympy.solvers.deutils import _desolve
+    from sympy.solvers.ode.ode import _helper_simplify, allhints, solve_ics
+except ImportError:  # pragma: no cover - SymPy moved its internals
+    _desolve = _helper_simplify = solve_ics = None  # type: ignore[assignment]
+    allhints = ()
+
+from tools.parser import ParseError, parse, parse_expr
+
+
+# Hints that only approximate (series) are tried after exact ones.
+_APPROXIMATE = ("1st_power_series", "2nd_power_series_ordinary", "2nd_power_series_regular")
+
+# Share of the timeout given to dsolve's default hint before falling back.
+QUICK_SHARE = 0.5
+
+
+def ode_function(eq: Basic) -> Optional[AppliedUndef]:
+    """The unknown function y(x) of an ODE, taken from its highest derivative."""
+    derivs = sorted(eq.atoms(Derivative), key=lambda d: d.derivative_count, reverse=True)
+    for d in derivs:
+        if isinstance(d.expr, AppliedUndef):
+            return d.expr
+    return None
+
+
+def default_hint(eq: Basic, func: AppliedUndef) -> Dict[str, object]:
+    """Early-exit classification: {hint: match} for dsolve's default hint only."""
+    match = _desolve(eq, func=func, hint="default", simplify=True, type="ode")
+    match.pop("eq", None)
+    return {match["hint"]: match}
+
+
+def candidate_hints(eq: Basic, func: AppliedUndef) -> Dict[str, object]:
+    """Full classification: {hint: match} for every hint, in dsolve's preference order."""
+    matches = _desolve(eq, func=func, hint="all", simplify=True, type="ode")
+    exact = [h for h in allhints if h in matches and not h.endswith("_Integral") and h not in _APPROXIMATE]
+    approx = [h for h in _APPROXIMATE if h in matches]
+    return {h: matches[h] for h in exact + approx}
+
+
+def _constants(sol: Basic) -> List[Symbol]:
+    return sorted((s for s in sol.free_symbols if re.fullmatch(r"C\d+", s.name)), key=lambda s: int(s.name[1:]))
+
+
+def _ic_holds(func: AppliedUndef, rhs: Basic, point: Basic, value: Basic) -> bool:
+    var = func.args[0]
+    got = point.replace(func.func, Lambda(var, rhs)).doit()
+    return (got - value).simplify() == 0
+
+
+def solve_ode(
+    eq: Union[str, Basic],
+    func: Optional[str] = None,
+    var: str = "x",
+    ics: Optional[Sequence[Union[str, Basic]]] = None,
+    timeout: float = 5.0,
+    max_workers: int = 4,
+) -> Dict[str, object]:
+    """
+    Solve an ODE such as "y'' - y = 0" (or an Eq built by the parser) for `func`
+    of `var`, apply initial conditions given as equations ("y(0)=1", "y'(0)=0"),
+    and verify the result with checkodesol. Return: status, general_str,
+    solution_str, latex, hint, constants, checks, elapsed.
+    """
+    start = time.perf_counter()
+    try:
+        x = Symbol(var)
+        equation = parse_expr(eq) if isinstance(eq, Basic) else parse(str(eq), indep=var)
+        if not isinstance(equation, Equality):
+            equation = Eq(equation, 0)
+        f = Function(func)(x) if func else ode_function(equation)
+        if f is None:
+            raise ValueError("no derivative of an unknown function found")
+        equation = equation.xreplace({Symbol(f.func.__name__): f})
+        conditions: Dict[Basic, Basic] = {}
+        for ic in ics or ():
+            ic_eq = parse_expr(ic) if isinstance(ic, Basic) else parse(str(ic), indep=var)
+            if not isinstance(ic_eq, Equality):
+                raise ValueError(f"initial condition is not an equation: {ic}")
+            conditions[ic_eq.lhs] = ic_eq.rhs
+
+        deadline = start + timeout
+        if _desolve is None:
+            hint, general = _bounded(_solve_public, (equation, f), max(0.0, deadline - time.perf_counter()))
+        else:
+            try:
+                quick_budget = max(0.0, deadline - time.perf_counter()) * QUICK_SHARE
+                hint, general = _interrupted_after(quick_budget, _solve_default, equation, f)
+            except (NotImplementedError, TimeoutError, ValueError):
+                remaining = max(0.0, deadline - time.perf_counter())
+                try:
+                    hint, general = _bounded(_solve_all, (equation, f, remaining, max_workers), remaining)
+                except TimeoutError:
+                    raise TimeoutError(f"no dsolve hint finished within {timeout:g}s") from None
+        sols = general if isinstance(general, list) else [general]
+
+        checks: List[Dict[str, object]] = []
+        particular = sols
+        constants = {}
+        if conditions:
+            if solve_ics is None:
+                particular = dsolve(equation, f, ics=conditions)
+                particular = particular if isinstance(particular, list) else [particular]
+                constants = {}
+            else:
+                constants = solve_ics(sols, [f], _constants(sols[0]), conditions)
+                particular = [s.subs(constants) for s in sols]
+            for point, value in conditions.items():
+                holds = all(_ic_holds(f, s.rhs, point, value) for s in particular)
+                checks.append({"check": f"{point} = {value}", "passed": holds})
+        for s in particular:
+            ok, _residual = checkodesol(equation, s, f)
+            checks.append({"check": f"checkodesol({s.rhs})", "passed": bool(ok)})
+
+        def _fmt(items: List[Basic]) -> str:
+            return "; ".join(f"{s.lhs} = {s.rhs}" for s in items)
+
+        return {
+            "status": "ok",
+            "hint": hint,
+            "equation_latex": sympy_latex(equation),
+            "general_str": _fmt(sols),
+            "general_latex": ", ".join(sympy_latex(s) for s in sols),
+            "solution_str": _fmt(particular),
+            "latex": ", ".join(sympy_latex(s) for s in particular),
+            "constants": {str(k): str(v) for k, v in constants.items()},
+            "checks": checks,
+            "elapsed": time.perf_counter() - start,
+        }
+    except (ParseError, Exception) as exc:  # noqa: BLE001
+        return {"status": "error", "message": str(exc), "elapsed": time.perf_counter() - start}
+
+
+def _solve_hint(conn, eq: Basic, hint: str, match: object) -> None:
+    try:
+        conn.send(("ok", _helper_simplify(eq, hint, match, True)))
+    except Exception as exc:  # noqa: BLE001 - reported to the parent
+        conn.send(("error", str(exc)))
+    finally:
+        conn.close()
+
+
+def _can_fork() -> bool:
+    return "fork" in mp.get_all_start_methods() and not mp.current_process().daemon
+
+
+def _solve_default(eq: Basic, func: AppliedUndef):
+    ((hint, match),) = default_hint(eq, func).items()
+    return hint, _helper_simplify(eq, hint, match, True)
+
+
+def _solve_public(eq: Basic, func: AppliedUndef):
+    return classify_ode(eq, func)[0], dsolve(eq, func)
+
+
+def _interrupted_after(timeout: float, fn, *args):
+    """fn(*args), interrupted with TimeoutError after `timeout` seconds when
+    called from the main thread (signals reach no other); elsewhere unbounded."""
+    if threading.current_thread() is not threading.main_thread() or not hasattr(signal, "setitimer"):
+        return fn(*args)
+    if timeout <= 0:
+        raise TimeoutError("no time left for the default hint")
+
+    def expire(signum, frame):
+        raise TimeoutError(f"default hint did not finish within {timeout:g}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _solve_all(eq: Basic, func: AppliedUndef, timeout: float, max_workers: int):
+    start = time.perf_counter()
+    hints = candidate_hints(eq, func)
+    if not hints:
+        raise NotImplementedError("no dsolve hint matches this equation")
+    return _race(eq, hints, max(0.0, timeout - (time.perf_counter() - start)), max_workers)
+
+
+def _bounded_main(conn, fn, args) -> None:
+    # Own process group, so the parent can kill this process and its hint workers at once.
+    os.setpgid(0, 0)
+    try:
+        conn.send(("ok", fn(*args)))
+    except Exception as exc:  # noqa: BLE001 - re-raised in the parent
+        conn.send(("error", (type(exc).__name__, str(exc))))
+    finally:
+        conn.close()
+
+
+def _bounded(fn, args: tuple, timeout: float):
+    """fn(*args) in a forked process group that is killed after `timeout` seconds."""
+    if not _can_fork():
+        return fn(*args)
+    ctx = mp.get_context("fork")
+    parent, child = ctx.Pipe(duplex=False)
+    # Not daemonic: _solve_all starts hint workers of its own.
+    proc = ctx.Process(target=_bounded_main, args=(child, fn, args), daemon=False)
+    proc.start()
+    child.close()
+    try:
+        if not wait([parent], timeout=timeout):
+            raise TimeoutError(f"no dsolve hint finished within {timeout:g}s")
+        try:
+            kind, payload = parent.recv()
+        except EOFError:
+            raise NotImplementedError(f"ODE worker exited with code {proc.exitcode}") from None
+    finally:
+        if proc.is_alive():
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except OSError:
+                proc.kill()
+        proc.join()
+        parent.close()
+    if kind == "ok":
+        return payload
+    name, message = payload
+    raise {"TimeoutError": TimeoutError, "ValueError": ValueError}.get(name, NotImplementedError)(message)
+
+
+def _race(eq: Basic, hints: Dict[str, object], timeout: float, max_workers: int):
+    """Solve hints concurrently; return (hint, solution) of the best-ranked success."""
+    order = list(hints)
+    done: Dict[str, object] = {}
+    failed: Dict[str, str] = {}
+
+    if not _can_fork():
+        for h in order:
+            try:
+                return h, _helper_simplify(eq, h, hints[h], True)
+            except Exception as exc:  # noqa: BLE001
+                failed[h] = str(exc)
+        raise NotImplementedError("; ".join(f"{h}: {m}" for h, m in failed.items()))
+
+    # Forked children inherit the match objects, which need not be picklable.
+    ctx = mp.get_context("fork")
+    queued = list(order)
+    running: Dict[object, tuple] = {}
+    deadline = time.perf_counter() + timeout
+
+    def launch() -> None:
+        while queued and len(running) < max(1, max_workers):
+            h = queued.pop(0)
+            parent, child = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_solve_hint, args=(child, eq, h, hints[h]), daemon=True)
+            proc.start()
+            child.close()
+            running[parent] = (h, proc)
+
+    try:
+        launch()
+        while running:
+            remaining = deadline - time.perf_counter()
+            ready = wait(list(running), timeout=max(0.0, remaining))
+            if not ready:
+                break  # deadline
+            for conn in ready:
+                h, proc = running.pop(conn)
+                try:
+                    kind, payload = conn.recv()
+                except EOFError:
+                    kind, payload = "error", f"worker exited with code {proc.exitcode}"
+                conn.close()
+                proc.join()
+                (done if kind == "ok" else failed)[h] = payload
+            # Stop once every better-ranked hint has failed.
+            for h in order:
+                if h in done:
+                    return h, done[h]
+                if h not in failed:
+                    break
+            launch()
+        if done:
+            best = next(h for h in order if h in done)
+            return best, done[best]
+        if failed and not running and not queued:
+            raise NotImplementedError("; ".join(f"{h}: {m}" for h, m in failed.items()))
+        raise TimeoutError(f"no dsolve hint finished within {timeout:g}s")
+    finally:
+        for conn, (_h, proc) in running.items():
+            proc.terminate()
+            proc.join()
+            conn.close()
@@ -0,0 +1,735 @@
+from __future__ import annotations
+
+"""Math-input tokenizer and parser that builds SymPy trees directly.
+
+Accepts plain SymPy syntax (``x**2``, ``sin(x)^2``), Unicode (∫, ∑, √, π, ∞,
+², ·, →) and LaTeX-ish input (``\\frac``, ``\\sqrt``, ``\\int_a^b ... dx``,
+``\\sum_{n=1}^{\\infty}``, ``\\lim_{x \\to 0}``), with implicit multiplication
+such as ``5x`` or ``2(x+1)``. Nothing goes through ``eval``; repeated inputs
+are served from an LRU cache.
+
+Conventions: a bare ``e`` is Euler's number; an unknown name directly
+followed by ``(`` is an undefined function application; juxtaposition of two
+bare names (``x y``) is rejected so that prose does not parse as a product,
+but a lone letter followed by a constant or function (``x e^x``) multiplies.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import sympy
+from sympy import (
+    Abs,
+    Basic,
+    Derivative,
+    E,
+    Eq,
+    Float,
+    Function,
+    I,
+    Integer,
+    Integral,
+    Limit,
+    Order,
+    Subs,
+    Sum,
+    Symbol,
+    Tuple as SymTuple,
+    factorial,
+    oo,
+    pi,
+    root,
+    sqrt,
+    zoo,
+    nan,
+)
+
+
+class ParseError(ValueError):
+    """Raised on malformed input; `pos` is the offending character offset."""
+
+    def __init__(self, message: str, pos: int) -> None:
+        super().__init__(f"{message} at position {pos}")
+        self.pos = pos
+
+
+_FUNCTIONS: Dict[str, object] = {
+    name: getattr(sympy, name)
+    for name in (
+        "sin", "cos", "tan", "cot", "sec", "csc",
+        "asin", "acos", "atan", "acot", "asec", "acsc", "atan2",
+        "sinh", "cosh", "tanh", "coth", "sech", "csch",
+        "asinh", "acosh", "atanh", "acoth",
+        "exp", "log", "sqrt", "root", "Abs", "sign", "floor", "ceiling",
+        "factorial", "binomial", "gamma", "erf", "erfc", "re", "im", "arg",
+        "conjugate", "Max", "Min", "Rational", "Integer", "Float",
+    )
+}
+_FUNCTIONS.update({
+    "ln": sympy.log,
+    "abs": Abs,
+    "arcsin": sympy.asin,
+    "arccos": sympy.acos,
+    "arctan": sympy.atan,
+    "O": Order,
+})
+
+_CONSTANTS: Dict[str, Basic] = {
+    "pi": pi,
+    "E": E,
+    "e": E,
+    "I": I,
+    "oo": oo,
+    "inf": oo,
+    "infty": oo,
+    "infinity": oo,
+    "zoo": zoo,
+    "nan": nan,
+}
+
+# Call forms that build unevaluated objects rather than computing.
+_CALL_FORMS = ("integrate", "Integral", "limit", "Limit", "diff", "Derivative", "summation", "Sum")
+
+# Directions of a one-sided limit, as written in limit(f, x, a, '-')
+LIMIT_DIRECTIONS = ("+", "-", "+-")
+
+_UNICODE = {
+    "−": "-", "·": "*", "×": "*", "÷": "/", "∗": "*",
+    "²": "^2", "³": "^3", "¹": "^1", "Σ": "∑",
+}
+# Single-character names; tokenized on their own so "2πr" is 2*pi*r.
+_UNICODE_NAMES = {
+    "π": "pi", "∞": "oo",
+    "α": "alpha", "β": "beta", "δ": "delta", "θ": "theta",
+    "λ": "lambda", "μ": "mu", "σ": "sigma", "φ": "phi", "ω": "omega",
+}
+_UNICODE_RE = re.compile("|".join(re.escape(k) for k in _UNICODE))
+
+_LATEX_DROP = re.compile(r"\\left|\\right|\\[,;:! ]|\\quad|\\qquad|\\displaystyle")
+_LATEX_WORD = {
+    "cdot": "*", "times": "*", "div": "/", "to": "→", "rightarrow": "→",
+    "infty": "oo", "int": "∫", "sum": "∑", "lim": "lim", "sqrt": "√",
+    "dfrac": "\\frac", "tfrac": "\\frac", "frac": "\\frac", "ln": "log",
+}
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+  | (?P<num>(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?)
+  | (?P<frac>\\frac)
+  | (?P<cmd>\\[A-Za-z]+)
+  | (?P<id>[A-Za-z][A-Za-z0-9]*)
+  | (?P<uname>[πα-ω∞])
+  | (?P<str>"[^"]*"|'[^']*')
+  | (?P<op>\*\*|->|[-+*/^_=,!|(){}\[\]∫∑√→])
+    """,
+    re.VERBOSE,
+)
+
+
+@dataclass(frozen=True)
+class Token:
+    kind: str  # num, id, str, op, frac, end
+    value: str
+    pos: int
+    space: bool  # whitespace precedes the token
+
+
+def _normalize(text: str) -> str:
+    text = _UNICODE_RE.sub(lambda m: _UNICODE[m.group(0)], text)
+    text = _LATEX_DROP.sub(" ", text)
+    text = text.replace("\\mathrm{d}", " d").replace("\\operatorname", "")
+    return text
+
+
+def tokenize(text: str) -> List[Token]:
+    """Split normalized input into tokens; raises ParseError on unknown characters."""
+    tokens: List[Token] = []
+    pos = 0
+    space = False
+    while pos < len(text):
+        if text[pos] == "'" and not space and tokens and (tokens[-1].kind == "id" or tokens[-1].value == "'"):
+            # y'' is a derivative; 'x' elsewhere is a quoted string
+            tokens.append(Token("op", "'", pos, False))
+            pos += 1
+            continue
+        m = _TOKEN_RE.match(text, pos)
+        if m is None:
+            raise ParseError(f"unexpected character {text[pos]!r}", pos)
+        kind = m.lastgroup or ""
+        value = m.group(0)
+        if kind == "ws":
+            space = True
+            pos = m.end()
+            continue
+        if kind == "cmd":
+            word = value[1:]
+            mapped = _LATEX_WORD.get(word, word)
+            if mapped == "\\frac":
+                kind, value = "frac", mapped
+            elif mapped in ("*", "/", "→", "∫", "∑", "√"):
+                kind, value = "op", mapped
+            else:
+                kind, value = "id", mapped
+        elif kind == "uname":
+            if value not in _UNICODE_NAMES:
+                raise ParseError(f"unexpected character {value!r}", pos)
+            kind, value = "id", _UNICODE_NAMES[value]
+        elif kind == "op" and value == "**":
+            value = "^"
+        elif kind == "op" and value == "->":
+            value = "→"
+        # Glue subscripted names such as x_1 (but not int_/lim_/sum_ keywords).
+        if (
+            kind in ("id", "num")
+            and not space
+            and len(tokens) >= 2
+            and tokens[-1].value == "_"
+            and tokens[-2].kind == "id"
+            and tokens[-2].value not in ("lim",)
+            and not tokens[-1].space
+        ):
+            base = tokens[-2]
+            tokens[-2:] = [Token("id", f"{base.value}_{value}", base.pos, base.space)]
+        else:
+            tokens.append(Token(kind, value, m.start(), space))
+        space = False
+        pos = m.end()
+    tokens.append(Token("end", "", len(text), space))
+    return tokens
+
+
+_DIFFERENTIAL = re.compile(r"d[A-Za-z]$")
+
+
+def _declared_functions(tokens: List[Token]) -> set:
+    """Names the input itself uses as functions: primed (y', y''(0)) or defined
+    or evaluated at a single point (f(x) = ..., y(0) = 1)."""
+    names = set()
+    for i, t in enumerate(tokens[:-1]):
+        if t.kind != "id":
+            continue
+        nxt = tokens[i + 1]
+        if nxt.kind == "op" and nxt.value == "'":
+            names.add(t.value)
+        elif nxt.value == "(" and not nxt.space and i + 4 < len(tokens):
+            arg, close, eq = tokens[i + 2], tokens[i + 3], tokens[i + 4]
+            if (
+                close.value == ")" and eq.value == "="
+                and (arg.kind == "num" or (arg.kind == "id" and arg.value != t.value))
+            ):
+                names.add(t.value)
+    return names
+
+
+class _Parser:
+    def __init__(self, text: str, indep: str = "x", symbols: Tuple[str, ...] = ()) -> None:
+        self.text = text
+        self.indep = Symbol(indep)  # variable that primes differentiate by
+        self.symbols = symbols  # names that stay plain symbols (E, I as quantities)
+        self.tokens = tokenize(text)
+        self.functions = _declared_functions(self.tokens)
+        self.i = 0
+        self.last = ""  # kind of the last consumed token, for implicit multiplication
+        self.integrals = 0  # nesting depth; "dx" terminates an integrand
+        self.derivatives = 0  # nesting depth of diff(...)/Derivative(...)
+
+    # -- token helpers -------------------------------------------------
+    @property
+    def tok(self) -> Token:
+        return self.tokens[self.i]
+
+    def peek(self, k: int = 1) -> Token:
+        return self.tokens[min(self.i + k, len(self.tokens) - 1)]
+
+    def at(self, value: str) -> bool:
+        return self.tok.kind in ("op", "frac") and self.tok.value == value
+
+    def advance(self) -> Token:
+        t = self.tok
+        self.i += 1
+        self.last = "close" if t.value in (")", "}", "|", "!") else t.kind
+        return t
+
+    def expect(self, value: str) -> Token:
+        if not self.at(value):
+            raise ParseError(f"expected {value!r}", self.tok.pos)
+        return self.advance()
+
+    def error(self, message: str) -> ParseError:
+        return ParseError(message, self.tok.pos)
+
+    def at_differential(self) -> bool:
+        t = self.tok
+        if not self.integrals or t.kind != "id":
+            return False
+        if _DIFFERENTIAL.match(t.value):
+            return True
+        return t.value == "d" and self.peek().kind == "id"
+
+    # -- grammar -------------------------------------------------------
+    def parse(self) -> Basic:
+        items = [self.statement()]
+        while self.at(","):
+            self.advance()
+            items.append(self.statement())
+        if self.tok.kind != "end":
+            raise self.error(f"unexpected {self.tok.value!r}")
+        return items[0] if len(items) == 1 else SymTuple(*items)
+
+    def statement(self) -> Basic:
+        lhs = self.expr()
+        if self.at("="):
+            self.advance()
+            return Eq(lhs, self.expr(), evaluate=False)
+        return lhs
+
+    def expr(self) -> Basic:
+        node = self.term()
+        while self.at("+") or self.at("-"):
+            op = self.advance().value
+            rhs = self.term()
+            node = node + rhs if op == "+" else node - rhs
+        return node
+
+    def starts_implicit_factor(self) -> bool:
+        t = self.tok
+        if self.at_differential() or t.kind == "end":
+            return False
+        if t.kind == "frac" or (t.kind == "op" and t.value in ("(", "{", "√", "∫", "∑")):
+            return self.last in ("num", "close")
+        if t.kind == "id":
+            if t.value == "lim" or t.value in _FUNCTIONS or t.value in _CONSTANTS:
+                # "x e^x", "x sin(x)": a lone letter times a constant or function
+                return self.last in ("num", "close") or (self.last == "id" and len(self.peek(-1).value) == 1)
+            # "5x" multiplies, "4 for" is prose
+            return self.last in ("num", "close") and not t.space
+        return False
+
+    def term(self) -> Basic:
+        node = self.unary()
+        while True:
+            if self.at("*") or self.at("/"):
+                op = self.advance().value
+                rhs = self.unary()
+                node = node * rhs if op == "*" else node / rhs
+            elif self.starts_implicit_factor():
+                node = node * self.unary()
+            else:
+                return node
+
+    def unary(self) -> Basic:
+        if self.at("-"):
+            self.advance()
+            return -self.unary()
+        if self.at("+"):
+            self.advance()
+            return self.unary()
+        return self.power()
+
+    def power(self) -> Basic:
+        base = self.postfix()
+        if self.at("^") and not (self.peek().value in ("+", "-") and self.peek(2).value in ("}", ")")):
+            # (the guard leaves one-sided limit points such as 0^+ to limit())
+            self.advance()
+            return base ** self.exponent()
+        return base
+
+    def exponent(self) -> Basic:
+        if self.at("{"):
+            return self.group("{", "}")
+        return self.unary()
+
+    def postfix(self) -> Basic:
+        node = self.primary()
+        while self.at("!"):
+            self.advance()
+            node = factorial(node)
+        return node
+
+    def group(self, open_: str, close: str) -> Basic:
+        self.expect(open_)
+        node = self.expr()
+        self.expect(close)
+        return node
+
+    def primary(self) -> Basic:
+        t = self.tok
+        if t.kind == "num":
+            self.advance()
+            if "." in t.value or "e" in t.value.lower():
+                return Float(t.value)
+            return Integer(t.value)
+        if t.kind == "str":
+            self.advance()
+            try:
+                return parse(t.value[1:-1], symbols=self.symbols)
+            except ParseError as exc:
+                # report the error at the string, not at its offset inside it
+                raise ParseError(f"cannot parse {t.value}", t.pos) from exc
+        if t.kind == "frac":
+            self.advance()
+            num = self.braced_or_primary()
+            den = self.braced_or_primary()
+            self.last = "close"
+            return num / den
+        if t.kind == "id":
+            return self.name()
+        if t.kind == "op":
+            if t.value == "(":
+                self.advance()
+                first = self.statement()
+                if self.at(","):
+                    items = [first]
+                    while self.at(","):
+                        self.advance()
+                        items.append(self.statement())
+                    self.expect(")")
+                    return SymTuple(*items)
+                self.expect(")")
+                return first
+            if t.value == "{":
+                return self.group("{", "}")
+            if t.value == "|":
+                self.advance()
+                inner = self.expr()
+                self.expect("|")
+                return Abs(inner)
+            if t.value == "√":
+                self.advance()
+                if self.at("["):
+                    self.advance()
+                    n = self.expr()
+                    self.expect("]")
+                    return root(self.braced_or_primary(), n)
+                return sqrt(self.braced_or_primary())
+            if t.value == "∫":
+                return self.integral()
+            if t.value == "∑":
+                return self.summation()
+        raise self.error(f"unexpected {t.value or 'end of input'!r}")
+
+    def braced_or_primary(self) -> Basic:
+        if self.at("{"):
+            return self.group("{", "}")
+        return self.postfix()
+
+    def call_args(self) -> List[Basic]:
+        self.expect("(")
+        args: List[Basic] = []
+        if not self.at(")"):
+            args.append(self.statement())
+            while self.at(","):
+                self.advance()
+                args.append(self.statement())
+        self.expect(")")
+        return args
+
+    def name(self) -> Basic:
+        t = self.advance()
+        name = t.value
+        if name == "lim":
+            return self.limit()
+        if self.at("'"):
+            return self.primed(name)
+        called = self.at("(") and not self.tok.space
+        if name in self.symbols and not called:
+            return Symbol(name)
+        if name in ("limit", "Limit") and called:
+            return self.call_form(name, *self.limit_args(), pos=t.pos)
+        if name in ("diff", "Derivative") and called:
+            self.derivatives += 1
+            try:
+                args = self.call_args()
+            finally:
+                self.derivatives -= 1
+            return self.call_form(name, args, pos=t.pos)
+        if name in _CALL_FORMS and called:
+            return self.call_form(name, self.call_args(), pos=t.pos)
+        if name in _FUNCTIONS:
+            fn = _FUNCTIONS[name]
+            power = None
+            if self.at("^") and not called:
+                # \sin^2 x  ->  sin(x)**2
+                self.advance()
+                power = self.exponent()
+            if self.at("(") and (called or power is not None):
+                result = fn(*self.call_args())  # type: ignore[operator]
+            else:
+                # Function applied without parentheses: \sin x, ln 2
+                result = fn(self.power())  # type: ignore[operator]
+            return result if power is None else result ** power
+        if name in _CONSTANTS and not (called and name in self.functions):
+            self.last = "close"  # 2πr, πx, e(x+1)
+            return _CONSTANTS[name]
+        if called and len(name) == 1 and not self.applied(name):
+            # x(x-2), 2x(x+1): a lone letter before "(" multiplies
+            self.last = "close"
+            return Symbol(name)
+        if called:
+            return Function(name)(*self.call_args())
+        return Symbol(name)
+
+    def applied(self, name: str) -> bool:
+        """Whether `name(` here is a function application rather than a product:
+        the input uses it as a function elsewhere, it is differentiated
+        (diff(y(x), x)), or its argument is the lone independent variable (y(x))."""
+        if name in self.functions or self.derivatives:
+            return True
+        arg, close = self.peek(), self.peek(2)
+        return arg.kind == "id" and arg.value == self.indep.name != name and close.value == ")"
+
+    def primed(self, name: str) -> Basic:
+        # y'' -> Derivative(y(x), (x, 2)); y'(0) -> Subs(Derivative(y(x), x), x, 0)
+        order = 0
+        while self.at("'"):
+            self.advance()
+            order += 1
+        self.last = "close"
+        node = Derivative(Function(name)(self.indep), (self.indep, order))
+        if self.at("(") and not self.tok.space:
+            args = self.call_args()
+            if len(args) != 1:
+                raise self.error("a derivative takes one evaluation point")
+            return Subs(node, self.indep, args[0])
+        return node
+
+    def limit_args(self) -> Tuple[List[Basic], Optional[str]]:
+        """Arguments of limit(f, x, a, '-'); the direction may also be given as dir='-'."""
+        self.expect("(")
+        args: List[Basic] = []
+        direction = None
+        while not self.at(")"):
+            if args or direction is not None:
+                self.expect(",")
+            k = 2 if self.tok.value == "dir" and self.peek().value == "=" else 0
+            quoted = self.peek(k)
+            if quoted.kind == "str" and quoted.value[1:-1].strip() in LIMIT_DIRECTIONS:
+                self.i += k
+                direction = self.advance().value[1:-1].strip()
+            elif k:
+                raise self.error("dir must be '+', '-' or '+-'")
+            else:
+                args.append(self.statement())
+        self.expect(")")
+        return args, direction
+
+    def call_form(self, name: str, args: List[Basic], direction: Optional[str] = None, pos: int = 0) -> Basic:
+        if not args:
+            raise ParseError(f"{name} needs arguments", pos)
+        f, rest = args[0], args[1:]
+        if name in ("integrate", "Integral"):
+            if len(rest) >= 2 and isinstance(rest[-1], SymTuple):
+                rest = rest[1:]  # integrate(f, x, (x, a, b))
+            return Integral(f, *rest)
+        if name in ("limit", "Limit"):
+            return Limit(f, *rest) if direction is None else Limit(f, *rest, dir=direction)
+        if name in ("diff", "Derivative"):
+            return Derivative(f, *rest, evaluate=False)
+        return Sum(f, *rest)
+
+    def bounds(self) -> Tuple[Optional[Basic], Optional[Basic]]:
+        lower = upper = None
+        if self.at("_"):
+            self.advance()
+            lower = self.bound()
+        if self.at("^"):
+            self.advance()
+            upper = self.bound()
+        return lower, upper
+
+    def bound(self) -> Basic:
+        if self.at("{"):
+            return self.group("{", "}")
+        if self.at("-"):
+            self.advance()
+            return -self.postfix()
+        return self.postfix()
+
+    def integral(self) -> Basic:
+        self.expect("∫")
+        lower, upper = self.bounds()
+        self.integrals += 1
+        try:
+            body = Integer(1) if self.at_differential() else self.expr()
+        finally:
+            self.integrals -= 1
+        if self.tok.kind != "id" or not (self.tok.value == "d" or _DIFFERENTIAL.match(self.tok.value)):
+            raise self.error("expected differential (dx)")
+        d = self.advance().value
+        var = Symbol(self.advance().value if d == "d" else d[1:])
+        self.last = "close"
+        if (lower is None) != (upper is None):
+            raise self.error("integral needs both bounds")
+        if lower is None:
+            return Integral(body, var)
+        return Integral(body, (var, lower, upper))
+
+    def summation(self) -> Basic:
+        pos = self.expect("∑").pos
+        if not self.at("_"):
+            raise ParseError("sum needs a lower bound", pos)
+        self.advance()
+        self.expect("{")
+        var = Symbol(self.advance().value)
+        self.expect("=")
+        lower = self.expr()
+        self.expect("}")
+        self.expect("^")
+        upper = self.bound()
+        return Sum(self.term(), (var, lower, upper))
+
+    def limit(self) -> Basic:
+        if not self.at("_"):
+            raise self.error("expected subscript after lim")
+        self.advance()
+        braced = self.at("{") or self.at("(")
+        close = "}" if self.at("{") else ")"
+        if braced:
+            self.advance()
+        var = Symbol(self.advance().value)
+        self.expect("→")
+        point = self.expr() if braced else self.bound()
+        direction = None
+        if self.at("^") and self.peek().value in ("+", "-"):
+            self.advance()
+            direction = self.advance().value
+        if braced:
+            self.expect(close)
+        self.last = "close"
+        body = self.term()
+        if direction is None:
+            return Limit(body, var, point)
+        return Limit(body, var, point, direction)
+
+
+@lru_cache(maxsize=4096)
+def _parse_cached(text: str, indep: str, symbols: Tuple[str, ...]) -> Basic:
+    return _Parser(_normalize(text), indep, symbols).parse()
+
+
+def parse(text: str, indep: str = "x", symbols: Iterable[str] = ()) -> Basic:
+    """Parse one statement (expression, ``lhs = rhs`` or comma list) into SymPy.
+
+    `indep` is the variable that prime notation (``y''``) differentiates by.
+    Names in `symbols` parse as plain symbols even where they would otherwise
+    be constants or functions (``E`` for energy, ``I`` for current).
+    """
+    return _parse_cached(text.strip(), indep, tuple(sorted(symbols)))
+
+
+def parse_expr(expr: Union[str, Basic, int, float], symbols: Iterable[str] = ()) -> Basic:
+    """Drop-in replacement for ``sympify`` on user input; SymPy objects pass through."""
+    if isinstance(expr, Basic):
+        return expr
+    if isinstance(expr, (int, float)):
+        return sympy.sympify(expr)
+    return parse(str(expr), symbols=symbols)
+
+
+def _is_word(node: Basic) -> bool:
+    return isinstance(node, Symbol) and (len(node.name) > 1 or node.name in ("a", "A"))
+
+
+# Math left outside the chosen span: operators, lim, a call "f(", a lone
+# variable letter (not the words "a"/"I") or a primed one (y', not "What's").
+_LEFTOVER_MATH = re.compile(
+    r"[∫∑√^→=]|\\frac|\blim\b|[A-Za-z]\w*\(|(?<![\w'])(?![aAI]\b)[A-Za-z](?![\w'])|\b(?![aAI]')[A-Za-z]'"
+)
+# Operations named in prose, and the node the parsed span must contain for them.
+_OPERATION_WORDS = (
+    (re.compile(r"\b(?:derivative|differentiate)\b", re.IGNORECASE), Derivative),
+    (re.compile(r"\b(?:integral|integrate|antiderivative|area)\b", re.IGNORECASE), Integral),
+    (re.compile(r"\blimit\b", re.IGNORECASE), Limit),
+    (re.compile(r"\bsum\b", re.IGNORECASE), Sum),
+)
+
+
+def _check_rest(rest: str, node: Basic) -> None:
+    """Raise ParseError when text outside the parsed span still holds math, or
+    names an operation the span does not carry ("the derivative of sin(x)")."""
+    m = _LEFTOVER_MATH.search(rest)
+    if m is not None:
+        raise ParseError(f"unparsed math {m.group(0)!r} outside the expression", 0)
+    for words, kind in _OPERATION_WORDS:
+        m = words.search(rest)
+        if m is not None and not node.has(kind):
+            raise ParseError(f"{m.group(0)!r} is not part of the parsed expression", 0)
+
+
+def _spans(text: str, indep: str) -> Iterator[Tuple[int, int, Basic]]:
+    """Yield (start, length, node) for the math starting at each word of `text`.
+
+    A suffix that does not parse as a whole falls back to its longest
+    parseable prefix; lone words are dropped as prose.
+    """
+    starts = [0] + [m.end() for m in re.finditer(r"\s+", text)]
+    for start in starts:
+        candidate = text[start:]
+        try:
+            span, node = candidate, parse(candidate, indep)
+        except (ParseError, TypeError, ValueError) as exc:
+            pos = getattr(exc, "pos", None)
+            if not pos:
+                continue
+            span = candidate[:pos].rstrip(" ,;:.?")
+            try:
+                node = parse(span, indep)
+            except (ParseError, TypeError, ValueError):
+                continue
+        if isinstance(node, SymTuple):
+            kept = [n for n in node if not _is_word(n)]
+            node = kept[0] if len(kept) == 1 else SymTuple(*kept)
+        if _is_word(node) or node == SymTuple():
+            continue
+        yield start, len(span), node
+
+
+def extract(text: str, indep: str = "x", strict: bool = False) -> Basic:
+    """Parse the math embedded in a sentence ("Compute ∫_0^1 x^2 dx").
+
+    The longest span found from any word start wins. With `strict`, the rest
+    of the sentence must be plain prose: a ParseError is raised when it still
+    holds math the parser could not read, so a fragment is never answered in
+    place of the whole problem.
+    """
+    text = _normalize(text.strip())
+    best: Optional[Tuple[int, int, Basic]] = None
+    for start, length, node in _spans(text, indep):
+        if best is None or length > best[1]:
+            best = (start, length, node)
+        if len(text) - start <= best[1]:
+            break
+    if best is None:
+        raise ParseError("no math found", 0)
+    start, length, node = best
+    if strict:
+        _check_rest(text[:start] + " " + text[start + length:], node)
+    return node
+
+
+def extract_all(text: str, indep: str = "x") -> List[Basic]:
+    """Every non-overlapping math span of a sentence, left to right; comma lists are flattened.
+
+    "Solve y'' - y = 0 with y(0)=1, y'(0)=0" -> [Eq(...), Eq(y(0), 1), Eq(Subs(...), 0)]
+    """
+    text = _normalize(text.strip())
+    found: List[Basic] = []
+    resume = 0
+    for start, length, node in _spans(text, indep):
+        if start < resume:
+            continue
+        found.extend(node if isinstance(node, SymTuple) else [node])
+        resume = start + length
+    return found
+
+
+def cache_info():
+    """LRU statistics of the memoized parser (hits, misses, maxsize, currsize)."""
+    return _parse_cached.cache_info()
+
+
+def clear_cache() -> None:
+    _parse_cached.cache_clear()
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+"""Write-up rendering from pipeline state.
+
+Sections are rendered from templates compiled once at import, in Markdown,
+HTML or JSON. A `Renderer` keeps each rendered section and re-renders only the
+sections whose stage output changed, so it can be fed state after every
+pipeline stage and produce a partial write-up at any point. Expressions are
+printed through the memoized `tools.latex.to_latex`, which reuses LaTeX the
+solver already produced.
+
+The Markdown form always ends with "### Final Answer" and a \\boxed{} plain-text
+answer; batch reports and the known-results builder rely on that layout.
+"""
+
+import html
+import json
+from string import Template
+from typing import Callable, Dict, List, Mapping, Optional
+
+from tools.latex import to_latex
+
+
+FORMATS = ("markdown", "html", "json")
+
+SECTIONS = ("plan", "derivation", "research", "verification", "answer")
+
+# Which state key feeds which sections
+STAGE_SECTIONS: Dict[str, tuple] = {
+    "plan_json": ("plan",),
+    "solver_output": ("derivation", "answer"),
+    "research_output": ("research",),
+    "verification_report": ("verification",),
+}
+
+_MARKDOWN = {
+    "plan": Template("### Plan\n$steps\n$extras\n"),
+    "derivation": Template("### Derivation Steps\n$steps\n\n"),
+    "research": Template("### Research Notes\n$notes\n\n"),
+    "verification": Template("### Verification\n**Status:** $status\n$details\n\n"),
+    "answer": Template("### Final Answer\n\\boxed{$answer}"),
+}
+
+_HTML = {
+    "plan": Template('<section class="plan"><h3>Plan</h3><ol>$steps</ol>$extras</section>\n'),
+    "derivation": Template('<section class="derivation"><h3>Derivation Steps</h3><ul>$steps</ul></section>\n'),
+    "research": Template('<section class="research"><h3>Research Notes</h3>$notes</section>\n'),
+    "verification": Template(
+        '<section class="verification $status"><h3>Verification</h3>'
+        "<p><strong>Status:</strong> $status</p><ul>$details</ul></section>\n"
+    ),
+    "answer": Template('<section class="answer"><h3>Final Answer</h3><p>\\[\\boxed{$answer}\\]</p></section>\n'),
+}
+
+_HTML_DOCUMENT = Template('<article class="writeup">\n$body</article>\n')
+
+
+def _plan_fields(plan: Mapping[str, object], fmt: str) -> Dict[str, str]:
+    steps = list(plan.get("steps", []))  # type: ignore[call-overload]
+    extras = [
+        ("Expected theorems", plan.get("expected_theorems", [])),
+        ("Verification items", plan.get("verification_items", [])),
+    ]
+    if fmt == "html":
+        return {
+            "steps": "".join(
+                f"<li>{html.escape(str(s.get('step', s)))} <code>{html.escape(str(s.get('tool', '')))}</code></li>"
+                if isinstance(s, dict) else f"<li>{html.escape(str(s))}</li>"
+                for s in steps
+            ),
+            "extras": "".join(
+                f"<p>{label}: {html.escape(', '.join(map(str, items)))}</p>" for label, items in extras if items
+            ),
+        }
+    lines = [
+        f"{i}. {s.get('step', s)} (`{s.get('tool', '')}`)" if isinstance(s, dict) else f"{i}. {s}"
+        for i, s in enumerate(steps, 1)
+    ]
+    return {
+        "steps": "\n".join(lines) or "_No plan steps._",
+        "extras": "".join(f"{label}: {', '.join(map(str, items))}\n" for label, items in extras if items),
+    }
+
+
+def _derivation_fields(solver: Mapping[str, object], fmt: str) -> Dict[str, str]:
+    steps = [str(s) for s in solver.get("derivation_steps", [])]  # type: ignore[union-attr]
+    if fmt == "html":
+        return {"steps": "".join(f"<li>\\({html.escape(s)}\\)</li>" for s in steps)}
+    return {"steps": "\n".join(f"- {s}" for s in steps)}
+
+
+def _research_fields(research: Mapping[str, object], fmt: str) -> Dict[str, str]:
+    summary = str(research.get("summary", "") or "")
+    citations = [
+        c.get("title") or c.get("url", "") if isinstance(c, dict) else str(c)
+        for c in research.get("citations", [])  # type: ignore[union-attr]
+    ]
+    expressions = [to_latex(e) for e in research.get("key_expressions", [])]  # type: ignore[union-attr]
+    if fmt == "html":
+        parts = [f"<p>{html.escape(summary)}</p>"] if summary else []
+        parts += [f"<p>\\({html.escape(e)}\\)</p>" for e in expressions]
+        if citations:
+            parts.append("<ul>" + "".join(f"<li>{html.escape(str(c))}</li>" for c in citations) + "</ul>")
+        return {"notes": "".join(parts) or "<p><em>No research notes.</em></p>"}
+    parts = [summary] if summary else []
+    parts += [f"$${e}$$" for e in expressions]
+    parts += [f"- {c}" for c in citations]
+    return {"notes": "\n".join(parts) or "_No research notes._"}
+
+
+def _verification_fields(verify: Mapping[str, object], fmt: str) -> Dict[str, str]:
+    status = str(verify.get("status", "unknown"))
+    details = [str(d) for d in verify.get("details", [])]  # type: ignore[union-attr]
+    if fmt == "html":
+        return {"status": html.escape(status), "details": "".join(f"<li>{html.escape(d)}</li>" for d in details)}
+    return {"status": status, "details": "\n".join(f"- {d}" for d in details)}
+
+
+def _answer_fields(solver: Mapping[str, object], fmt: str) -> Dict[str, str]:
+    answer = str(solver.get("final_answer", "") or "")
+    if fmt == "html":
+        return {"answer": html.escape(str(solver.get("final_latex") or to_latex(answer)))}
+    return {"answer": answer}
+
+
+_FIELDS: Dict[str, Callable[[Mapping[str, object], str], Dict[str, str]]] = {
+    "plan": _plan_fields,
+    "derivation": _derivation_fields,
+    "research": _research_fields,
+    "verification": _verification_fields,
+    "answer": _answer_fields,
+}
+
+
+def _json_section(section: str, data: Mapping[str, object]) -> object:
+    if section == "plan":
+        return dict(data)
+    if section == "derivation":
+        return list(data.get("derivation_steps", []))  # type: ignore[call-overload]
+    if section == "research":
+        return {**data, "key_expressions_latex": [to_latex(e) for e in data.get("key_expressions", [])]}  # type: ignore[union-attr]
+    if section == "verification":
+        return {"status": data.get("status", "unknown"), "details": list(data.get("details", []))}  # type: ignore[call-overload]
+    answer = str(data.get("final_answer", "") or "")
+    return {
+        "text": answer,
+        "latex": str(data.get("final_latex") or (to_latex(answer) if answer else "")),
+        "route": data.get("route", ""),
+        "source": data.get("source", ""),
+    }
+
+
+class Renderer:
+    """Incremental write-up renderer.
+
+    Usage:
+        r = Renderer("markdown")
+        r.feed(state)          # after any stage; unchanged stages are skipped
+        text = r.render()
+    """
+
+    def __init__(self, fmt: str = "markdown") -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown format: {fmt} (expected one of {', '.join(FORMATS)})")
+        self.fmt = fmt
+        self._seen: Dict[str, object] = {}
+        self._sections: Dict[str, object] = {}
+
+    def feed(self, state: Mapping[str, object]) -> List[str]:
+        """Render the sections whose stage output is new; returns their names."""
+        updated: List[str] = []
+        for key, sections in STAGE_SECTIONS.items():
+            value = state.get(key)
+            if value is None or self._seen.get(key) is value:
+                continue
+            self._seen[key] = value
+            for section in sections:
+                self._sections[section] = self._render_section(section, value)  # type: ignore[arg-type]
+                updated.append(section)
+        return updated
+
+    def _render_section(self, section: str, data: Mapping[str, object]) -> object:
+        if self.fmt == "json":
+            return _json_section(section, data)
+        templates = _HTML if self.fmt == "html" else _MARKDOWN
+        return templates[section].substitute(_FIELDS[section](data, self.fmt))
+
+    def section(self, name: str) -> Optional[object]:
+        return self._sections.get(name)
+
+    def render(self) -> str:
+        """The write-up so far; sections whose stage has not run are omitted,
+        except that Markdown and HTML always end with the (possibly empty) answer."""
+        if self.fmt == "json":
+            return json.dumps({s: self._sections[s] for s in SECTIONS if s in self._sections}, default=str)
+        parts = [self._sections[s] for s in SECTIONS[:-1] if s in self._sections]
+        answer = self._sections.get("answer")
+        if answer is None:
+            answer = self._render_section("answer", {})
+        body = "".join(parts) + str(answer)  # type: ignore[arg-type]
+        return _HTML_DOCUMENT.substitute(body=body) if self.fmt == "html" else body
+
+
+def render_writeup(state: Mapping[str, object], fmt: str = "markdown") -> str:
+    """One-shot rendering of a finished pipeline state."""
+    renderer = Renderer(fmt)
+    renderer.feed(state)
+    return renderer.render()
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+"""Precomputed table of known results (integrals, limits, series, roots, identities).
+
+Entries are indexed by a hash of a canonical form of the problem: the bound
+variable is renamed to a fixed placeholder and the expression is keyed by its
+SymPy srepr, so ``∫_0^1 t^2 dt`` and ``integrate("x**2", "x", ("x", 0, 1))``
+share one entry. Tables persist as gzip-compressed JSON lines and can be built
+from past batch reports.
+"""
+
+import ast
+import gzip
+import hashlib
+import json
+import os
+import re
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sympy import Symbol, Tuple, expand, simplify, srepr
+from sympy.printing.latex import latex as sympy_latex
+
+from tools.parser import LIMIT_DIRECTIONS, parse_expr
+
+
+KINDS = ("integral", "limit", "series", "solve", "simplify")
+
+_BOUND = Symbol("_v")
+
+
+@dataclass(frozen=True)
+class Entry:
+    kind: str
+    expr: str
+    var: str
+    args: tuple
+    result: str
+
+
+def canonical_key(kind: str, expr: object, var: object = None, args: Sequence[object] = ()) -> str:
+    """Hash of the canonical form of a problem; stable across processes."""
+    parsed = parse_expr(expr)
+    # limit directions ("-", "+-") are kept as marker symbols
+    parsed_args = [Symbol(str(a)) if str(a) in LIMIT_DIRECTIONS else parse_expr(a) for a in args]
+    if var is not None and str(var):
+        v = Symbol(str(var))
+        parsed = parsed.xreplace({v: _BOUND})
+        parsed_args = [a.xreplace({v: _BOUND}) for a in parsed_args]
+    if kind == "solve":
+        # lhs - rhs and rhs - lhs have the same roots
+        parsed = expand(parsed)
+        if parsed.could_extract_minus_sign():
+            parsed = -parsed
+    payload = "|".join([kind, srepr(parsed)] + [srepr(a) for a in parsed_args])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+
+
+def _values(answer: str) -> List[object]:
+    s = answer.strip()
+    if s.startswith("{") and s.endswith("}"):
+        inner = s[1:-1].strip()
+        if not inner:
+            return []
+        parsed = parse_expr(inner)
+        return list(parsed) if isinstance(parsed, Tuple) else [parsed]
+    return [parse_expr(s)]
+
+
+def answers_match(got: str, expected: str) -> bool:
+    """Compare two answers symbolically; solution sets ("{a, b}") compare as sets."""
+    try:
+        a, b = _values(got), _values(expected)
+    except Exception:  # noqa: BLE001
+        return got.strip() == expected.strip()
+    if len(a) != len(b):
+        return False
+    remaining = list(b)
+    for x in a:
+        for i, y in enumerate(remaining):
+            if x == y or simplify(x - y) == 0:
+                del remaining[i]
+                break
+        else:
+            return False
+    return True
+
+
+def answer_latex(answer: str) -> str:
+    """LaTeX of a stored answer; solution sets ("{a, b}") print as \\left\\{a, b\\right\\}."""
+    values = [sympy_latex(v) for v in _values(answer)]
+    if answer.strip().startswith("{"):
+        return r"\left\{%s\right\}" % ", ".join(values)
+    return values[0]
+
+
+class ResultTable:
+    """Canonical-form hashed index of known results."""
+
+    def __init__(self, entries: Iterable[Entry] = ()) -> None:
+        self._index: Dict[str, Entry] = {}
+        for e in entries:
+            self.add(e.kind, e.expr, e.var, e.args, e.result)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[Entry]:
+        return iter(self._index.values())
+
+    def add(self, kind: str, expr: object, var: object, args: Sequence[object], result: object) -> str:
+        if kind not in KINDS:
+            raise ValueError(f"unknown result kind: {kind}")
+        key = canonical_key(kind, expr, var, args)
+        self._index[key] = Entry(
+            kind=kind,
+            expr=str(expr),
+            var="" if var is None else str(var),
+            args=tuple(str(a) for a in args),
+            result=str(result),
+        )
+        return key
+
+    def lookup(self, kind: str, expr: object, var: object = None, args: Sequence[object] = ()) -> Optional[Entry]:
+        try:
+            return self._index.get(canonical_key(kind, expr, var, args))
+        except Exception:  # noqa: BLE001 - an unhashable problem is simply a miss
+            return None
+
+    def save(self, path: str) -> None:
+        """Write entries as gzip-compressed JSON lines."""
+        with gzip.open(path, "wt", encoding="utf-8") as fh:
+            for e in self._index.values():
+                fh.write(json.dumps(asdict(e), separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "ResultTable":
+        opener = gzip.open if str(path).endswith(".gz") else open
+        entries = []
+        with opener(path, "rt", encoding="utf-8") as fh:  # type: ignore[operator]
+            for line in fh:
+                if line.strip():
+                    d = json.loads(line)
+                    entries.append(Entry(d["kind"], d["expr"], d["var"], tuple(d["args"]), d["result"]))
+        return cls(entries)
+
+    def merge(self, other: "ResultTable") -> None:
+        self._index.update(other._index)
+
+
+_SEED = [
+    ("integral", "x**2", "x", ("0", "1"), "1/3"),
+    ("integral", "x", "x", ("0", "1"), "1/2"),
+    ("integral", "sin(x)", "x", ("0", "pi"), "2"),
+    ("integral", "exp(-x)", "x", ("0", "oo"), "1"),
+    ("integral", "exp(-x**2)", "x", ("-oo", "oo"), "sqrt(pi)"),
+    ("integral", "1/(x**2 + 1)", "x", ("0", "oo"), "pi/2"),
+    ("integral", "1/x", "x", ("1", "E"), "1"),
+    ("integral", "x**2", "x", (), "x**3/3"),
+    ("integral", "sin(x)", "x", (), "-cos(x)"),
+    ("integral", "cos(x)", "x", (), "sin(x)"),
+    ("integral", "exp(x)", "x", (), "exp(x)"),
+    ("integral", "1/x", "x", (), "log(x)"),
+    ("limit", "(1 + 1/n)**n", "n", ("oo",), "E"),
+    ("limit", "sin(x)/x", "x", ("0",), "1"),
+    ("limit", "(1 - cos(x))/x**2", "x", ("0",), "1/2"),
+    ("limit", "(exp(x) - 1)/x", "x", ("0",), "1"),
+    ("limit", "n**(1/n)", "n", ("oo",), "1"),
+    ("series", "sin(x)", "x", ("0", "6"), "x - x**3/6 + x**5/120 + O(x**6)"),
+    ("series", "cos(x)", "x", ("0", "6"), "1 - x**2/2 + x**4/24 + O(x**6)"),
+    ("series", "exp(x)", "x", ("0", "4"), "1 + x + x**2/2 + x**3/6 + O(x**4)"),
+    ("series", "1/(1 - x)", "x", ("0", "4"), "1 + x + x**2 + x**3 + O(x**4)"),
+    ("solve", "x**2 - 5*x + 6", "x", (), "{2, 3}"),
+    ("solve", "x**2 - 1", "x", (), "{-1, 1}"),
+    ("solve", "x**2 - 2", "x", (), "{-sqrt(2), sqrt(2)}"),
+    ("solve", "x**2 + 1", "x", (), "{-I, I}"),
+    ("simplify", "sin(x)**2 + cos(x)**2", "", (), "1"),
+    ("simplify", "cosh(x)**2 - sinh(x)**2", "", (), "1"),
+    ("simplify", "(x**2 - 1)/(x - 1)", "", (), "x + 1"),
+]
+
+
+def seed_table() -> ResultTable:
+    """Built-in textbook results."""
+    return ResultTable(Entry(k, e, v, a, r) for k, e, v, a, r in _SEED)
+
+
+@lru_cache(maxsize=1)
+def default_table() -> ResultTable:
+    """Seed table plus the file named by PANGUAN_RESULT_TABLE, if set."""
+    table = seed_table()
+    path = os.getenv("PANGUAN_RESULT_TABLE")
+    if path and Path(path).exists():
+        table.merge(ResultTable.load(path))
+    return table
+
+
+_BOXED = re.compile(r"\\boxed\{(.*)\}\s*$", re.S)
+
+
+def _report_entries(text: str) -> Iterator[tuple]:
+    for block in text.split("## Problem\n")[1:]:
+        problem, _, rest = block.partition("\n")
+        # the write-up has its own Verification section; the report's comes last
+        writeup, _, verification = rest.rpartition("### Verification\n")
+        m = _BOXED.search(writeup.strip())
+        if not m:
+            continue
+        try:
+            report = ast.literal_eval(verification.strip())
+        except (ValueError, SyntaxError):
+            report = {}
+        yield problem.strip(), m.group(1).strip(), report
+
+
+def build_from_reports(
+    paths: Iterable[str],
+    classify: Optional[Callable[[str], Optional[Dict[str, object]]]] = None,
+    table: Optional[ResultTable] = None,
+) -> ResultTable:
+    """Add every verified, non-empty answer found in Markdown batch reports.
+
+    `classify` maps a prompt to {"kind", "expr", "var", "args"}; it defaults
+    to the solver's problem parser.
+    """
+    if classify is None:
+        from agents.solver import parse_problem
+
+        def classify(text: str) -> Optional[Dict[str, object]]:
+            problem = parse_problem(text)
+            return None if problem is None else problem.as_dict()
+
+    table = ResultTable() if table is None else table
+    for path in paths:
+        for prompt, answer, report in _report_entries(Path(path).read_text()):
+            if not answer or report.get("status") != "passed":
+                continue
+            spec = classify(prompt)
+            if spec is None or spec["kind"] not in KINDS:
+                continue
+            try:
+                table.add(spec["kind"], spec["expr"], spec["var"], spec["args"], answer)  # type: ignore[arg-type]
+            except Exception:  # noqa: BLE001
+                continue
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a result table from batch reports")
+    parser.add_argument("reports", nargs="+")
+    parser.add_argument("-o", "--out", default="known_results.jsonl.gz")
+    parser.add_argument("--with-seed", action="store_true", help="include the built-in entries")
+    args = parser.parse_args()
+    built = build_from_reports(args.reports, table=seed_table() if args.with_seed else None)
+    built.save(args.out)
+    print(f"Wrote {len(built)} entries to {args.out}")
@@ -1,50 +1,352 @@
 from __future__ import annotations
 
-"""Minimal unit conversion utilities."""
+"""Unit conversion and dimensional analysis.
 
-from typing import Dict
+Every unit is stored once as an edge to the SI hub: a factor, an offset
+(temperatures only) and a dimension vector over the seven SI base
+dimensions. SI prefixes are expanded into the table at import time, and
+compound units ("km/h", "kg*m/s^2", "N·m") are resolved once and cached, so
+any conversion is a single multiply-add that applies to scalars and NumPy
+arrays alike.
+"""
 
-import math
+import re
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+from typing import Dict, Mapping, Optional, Tuple, Union
 
+import numpy as np
+from sympy import Abs, Add, Basic, Equality, Function, Max, Min, Mul, Number, NumberSymbol, Pow, Symbol, lambdify
+from sympy import ceiling, floor
 
-_LENGTH_TO_M = {
-    "mm": 0.001,
-    "cm": 0.01,
-    "m": 1.0,
-    "km": 1000.0,
+from tools.parser import ParseError, parse_expr
+
+
+BASE_DIMENSIONS = ("L", "M", "T", "I", "Θ", "N", "J")
+
+Dim = Tuple[Fraction, ...]
+DIMENSIONLESS: Dim = tuple(Fraction(0) for _ in BASE_DIMENSIONS)
+
+
+def _dim(**exps: int) -> Dim:
+    names = {"L": 0, "M": 1, "T": 2, "I": 3, "K": 4, "N": 5, "J": 6}
+    out = [Fraction(0)] * len(BASE_DIMENSIONS)
+    for k, v in exps.items():
+        out[names[k]] = Fraction(v)
+    return tuple(out)
+
+
+def _add(a: Dim, b: Dim) -> Dim:
+    return tuple(x + y for x, y in zip(a, b))
+
+
+def _scale(a: Dim, k: Fraction) -> Dim:
+    return tuple(x * k for x in a)
+
+
+def format_dimension(d: Dim) -> str:
+    parts = []
+    for name, e in zip(BASE_DIMENSIONS, d):
+        if e == 1:
+            parts.append(name)
+        elif e:
+            parts.append(f"{name}^{e}")
+    return " ".join(parts) or "1"
+
+
+@dataclass(frozen=True)
+class Unit:
+    factor: float  # SI value = value * factor + offset
+    dim: Dim
+    offset: float = 0.0
+
+
+_PREFIXES = {
+    "T": 1e12, "G": 1e9, "M": 1e6, "k": 1e3, "h": 1e2, "da": 1e1,
+    "d": 1e-1, "c": 1e-2, "m": 1e-3, "u": 1e-6, "µ": 1e-6, "μ": 1e-6, "n": 1e-9, "p": 1e-12, "f": 1e-15,
+}
+
+_LENGTH, _MASS, _TIME = _dim(L=1), _dim(M=1), _dim(T=1)
+_FORCE = _dim(M=1, L=1, T=-2)
+_ENERGY = _dim(M=1, L=2, T=-2)
+_POWER = _dim(M=1, L=2, T=-3)
+_CHARGE = _dim(I=1, T=1)
+_VOLTAGE = _dim(M=1, L=2, T=-3, I=-1)
+
+# name -> (factor, dimension, offset, takes SI prefixes)
+_DEFINITIONS: Dict[str, Tuple[float, Dim, float, bool]] = {
+    # SI base units (the gram carries the prefixes; kg is generated from it)
+    "m": (1.0, _LENGTH, 0.0, True),
+    "g": (1e-3, _MASS, 0.0, True),
+    "s": (1.0, _TIME, 0.0, True),
+    "A": (1.0, _dim(I=1), 0.0, True),
+    "K": (1.0, _dim(K=1), 0.0, True),
+    "mol": (1.0, _dim(N=1), 0.0, True),
+    "cd": (1.0, _dim(J=1), 0.0, False),
+    # SI derived units
+    "Hz": (1.0, _dim(T=-1), 0.0, True),
+    "N": (1.0, _FORCE, 0.0, True),
+    "Pa": (1.0, _dim(M=1, L=-1, T=-2), 0.0, True),
+    "J": (1.0, _ENERGY, 0.0, True),
+    "W": (1.0, _POWER, 0.0, True),
+    "C": (1.0, _CHARGE, 0.0, True),
+    "V": (1.0, _VOLTAGE, 0.0, True),
+    "ohm": (1.0, _dim(M=1, L=2, T=-3, I=-2), 0.0, True),
+    "Ω": (1.0, _dim(M=1, L=2, T=-3, I=-2), 0.0, True),
+    "F": (1.0, _dim(M=-1, L=-2, T=4, I=2), 0.0, True),
+    "T": (1.0, _dim(M=1, T=-2, I=-1), 0.0, True),
+    "Wb": (1.0, _dim(M=1, L=2, T=-2, I=-1), 0.0, True),
+    "H": (1.0, _dim(M=1, L=2, T=-2, I=-2), 0.0, True),
+    "L": (1e-3, _dim(L=3), 0.0, True),
+    "eV": (1.602176634e-19, _ENERGY, 0.0, True),
+    # Angles are dimensionless but keep their factors
+    "rad": (1.0, DIMENSIONLESS, 0.0, False),
+    "deg": (np.pi / 180.0, DIMENSIONLESS, 0.0, False),
+    # Common non-SI units
+    "min": (60.0, _TIME, 0.0, False),
+    "h": (3600.0, _TIME, 0.0, False),
+    "day": (86400.0, _TIME, 0.0, False),
+    "in": (0.0254, _LENGTH, 0.0, False),
+    "ft": (0.3048, _LENGTH, 0.0, False),
+    "yd": (0.9144, _LENGTH, 0.0, False),
+    "mi": (1609.344, _LENGTH, 0.0, False),
+    "lb": (0.45359237, _MASS, 0.0, False),
+    "oz": (0.028349523125, _MASS, 0.0, False),
+    "t": (1000.0, _MASS, 0.0, False),
+    "cal": (4.184, _ENERGY, 0.0, False),
+    "kcal": (4184.0, _ENERGY, 0.0, False),
+    "atm": (101325.0, _dim(M=1, L=-1, T=-2), 0.0, False),
+    "bar": (1e5, _dim(M=1, L=-1, T=-2), 0.0, False),
+    "degC": (1.0, _dim(K=1), 273.15, False),
+    "degF": (5.0 / 9.0, _dim(K=1), 273.15 - 32.0 * 5.0 / 9.0, False),
 }
 
 
-def _angle_to_rad(unit: str) -> float:
-    if unit == "rad":
-        return 1.0
-    if unit == "deg":
-        return math.pi / 180.0
-    raise ValueError(f"unknown angle unit: {unit}")
+def _build_table() -> Dict[str, Unit]:
+    table = {name: Unit(f, d, o) for name, (f, d, o, _p) in _DEFINITIONS.items()}
+    for name, (f, d, o, prefixed) in _DEFINITIONS.items():
+        if not prefixed:
+            continue
+        for p, pf in _PREFIXES.items():
+            # Plain names win over prefixed readings ("min" is minutes, not milli-inch).
+            table.setdefault(p + name, Unit(f * pf, d, o))
+    return table
+
+
+UNITS: Dict[str, Unit] = _build_table()
+
+_SUPERSCRIPTS = str.maketrans("⁰¹²³⁴⁵⁶⁷⁸⁹⁻", "0123456789-")
+_TERM = re.compile(r"\s*([A-Za-zµμΩ]+|1|\()")
+_EXPONENT = re.compile(r"\s*\^\s*\(?\s*(-?\d+(?:/\d+)?)\s*\)?")
+_OPERATOR = re.compile(r"\s*([*/])")
+
+
+@lru_cache(maxsize=1024)
+def resolve(unit: str) -> Unit:
+    """Resolve a unit expression such as "km/h" or "kg*m/s^2" to its SI edge."""
+    text = re.sub(r"([⁰¹²³⁴⁵⁶⁷⁸⁹⁻]+)", lambda m: "^" + m.group(1).translate(_SUPERSCRIPTS), unit.strip())
+    if text in UNITS:
+        return UNITS[text]
+    text = text.replace("**", "^").replace("·", "*")
+    # "N m" and "m s^-1" mean products
+    text = re.sub(r"(?<=[\w)])\s+(?=[A-Za-zµμΩ(])", "*", text)
 
+    def term(s: str, i: int):
+        """Parse name-or-group with optional exponent; return (factor, dim, next index)."""
+        m = _TERM.match(s, i)
+        if m is None:
+            raise ValueError(f"bad unit expression: {unit}")
+        if m.group(1) == "(":
+            f, d, j = product(s, m.end())
+            if j >= len(s) or s[j] != ")":
+                raise ValueError(f"unbalanced parentheses in unit: {unit}")
+            j += 1
+        elif m.group(1) == "1":
+            f, d, j = 1.0, DIMENSIONLESS, m.end()
+        else:
+            name = m.group(1)
+            if name not in UNITS:
+                raise ValueError(f"unknown unit: {name}")
+            u = UNITS[name]
+            if u.offset:
+                raise ValueError(f"{name} has an offset and cannot appear in a compound unit")
+            f, d, j = u.factor, u.dim, m.end()
+        e = _EXPONENT.match(s, j)
+        if e:
+            k = Fraction(e.group(1))
+            f, d, j = f ** float(k), _scale(d, k), e.end()
+        return f, d, j
 
-def convert(value: float, src: str, dst: str) -> Dict[str, object]:
+    def product(s: str, i: int):
+        f, d, j = term(s, i)
+        while True:
+            m = _OPERATOR.match(s, j)
+            if not m:
+                return f, d, j
+            f2, d2, j = term(s, m.end())
+            if m.group(1) == "*":
+                f, d = f * f2, _add(d, d2)
+            else:
+                f, d = f / f2, _add(d, _scale(d2, Fraction(-1)))
+
+    factor, dim, pos = product(text, 0)
+    if text[pos:].strip():
+        raise ValueError(f"bad unit expression: {unit}")
+    return Unit(factor, dim)
+
+
+def dimension_of(unit: str) -> Dim:
+    return resolve(unit).dim
+
+
+@lru_cache(maxsize=4096)
+def _edge(src: str, dst: str) -> Tuple[float, float]:
+    """(factor, offset) with dst_value = src_value * factor + offset."""
+    a, b = resolve(src), resolve(dst)
+    if a.dim != b.dim:
+        raise ValueError(
+            f"incompatible units: {src} [{format_dimension(a.dim)}] -> {dst} [{format_dimension(b.dim)}]"
+        )
+    factor = a.factor / b.factor
+    return factor, (a.offset - b.offset) / b.factor
+
+
+def convert(value: Union[float, np.ndarray, list], src: str, dst: str) -> Dict[str, object]:
     """
-    Minimal unit map: m↔cm↔mm, km↔m, deg↔rad. Use a dict of factors (src->m etc.).
-    Return: status, converted_value, factor; error on unknown units.
+    Convert `value` (a number, list or NumPy array; arrays convert in one
+    vectorized operation) from `src` to `dst`. Units may be compound ("km/h").
+    Return: status, converted_value, factor, offset, dimension; error on
+    unknown or incompatible units.
     """
     try:
-        # Length units
-        if src in _LENGTH_TO_M and dst in _LENGTH_TO_M:
-            to_m = _LENGTH_TO_M[src]
-            from_m = 1.0 / _LENGTH_TO_M[dst]
-            factor = to_m * from_m
-            return {"status": "ok", "converted_value": value * factor, "factor": factor}
-
-        # Angle units
-        if (src in {"deg", "rad"}) and (dst in {"deg", "rad"}):
-            to_rad = _angle_to_rad(src)
-            from_rad = 1.0 / _angle_to_rad(dst)
-            factor = to_rad * from_rad
-            return {"status": "ok", "converted_value": value * factor, "factor": factor}
-
-        raise ValueError(f"unknown conversion: {src} -> {dst}")
+        factor, offset = _edge(src, dst)
+        if isinstance(value, (list, tuple, np.ndarray)):
+            converted = np.asarray(value, dtype=float) * factor + offset
+        else:
+            converted = value * factor + offset
+        return {
+            "status": "ok",
+            "converted_value": converted,
+            "factor": factor,
+            "offset": offset,
+            "dimension": format_dimension(resolve(src).dim),
+        }
     except Exception as exc:  # noqa: BLE001
         return {"status": "error", "message": str(exc)}
 
 
+# Functions whose value carries the dimension of their (common) argument
+_SAME_DIMENSION = (Abs, Max, Min, floor, ceiling)
+# ... of which these do not commute with a change of units
+_UNIT_DEPENDENT = (floor, ceiling)
+
+
+def _expr_dim(node: Basic, dims: Mapping[Symbol, Dim]) -> Dim:
+    """Dimension of `node`; ValueError when it is inconsistent, NotImplementedError
+    for nodes this analysis does not cover."""
+    if isinstance(node, Equality):
+        lhs, rhs = _expr_dim(node.lhs, dims), _expr_dim(node.rhs, dims)
+        if lhs != rhs:
+            raise ValueError(f"sides differ: [{format_dimension(lhs)}] = [{format_dimension(rhs)}]")
+        return lhs
+    if isinstance(node, Symbol):
+        return dims.get(node, DIMENSIONLESS)
+    if isinstance(node, (Number, NumberSymbol)):
+        return DIMENSIONLESS
+    if isinstance(node, Add):
+        terms = [_expr_dim(a, dims) for a in node.args]
+        for t in terms[1:]:
+            if t != terms[0]:
+                raise ValueError(f"cannot add [{format_dimension(terms[0])}] and [{format_dimension(t)}]")
+        return terms[0]
+    if isinstance(node, Mul):
+        out = DIMENSIONLESS
+        for a in node.args:
+            out = _add(out, _expr_dim(a, dims))
+        return out
+    if isinstance(node, Pow):
+        base = _expr_dim(node.base, dims)
+        if _expr_dim(node.exp, dims) != DIMENSIONLESS:
+            raise ValueError("exponent must be dimensionless")
+        if base == DIMENSIONLESS:
+            return base
+        if not node.exp.is_Rational:
+            raise ValueError("dimensional base needs a rational exponent")
+        return _scale(base, Fraction(int(node.exp.p), int(node.exp.q)))
+    if isinstance(node, _SAME_DIMENSION):
+        args = [_expr_dim(a, dims) for a in node.args]
+        for a in args[1:]:
+            if a != args[0]:
+                raise ValueError(f"arguments of {node.func} differ: [{format_dimension(args[0])}] and [{format_dimension(a)}]")
+        return args[0]
+    if isinstance(node, Function):
+        for a in node.args:
+            if _expr_dim(a, dims) != DIMENSIONLESS:
+                raise ValueError(f"argument of {node.func} must be dimensionless")
+        return DIMENSIONLESS
+    raise NotImplementedError(f"cannot analyse {type(node).__name__}")
+
+
+def check_dimensions(expr: Union[str, Basic], units: Mapping[str, str], expected: Optional[str] = None) -> Dict[str, object]:
+    """
+    Dimension-check a whole expression or equation given units for its symbols
+    (unlisted symbols are dimensionless). Return: status, consistent,
+    dimension, and message when inconsistent or different from `expected`.
+    Expressions the analysis does not cover give status "error".
+    """
+    try:
+        parsed = parse_expr(expr, symbols=units)
+        dims = {Symbol(k): dimension_of(v) for k, v in units.items()}
+        try:
+            d = _expr_dim(parsed, dims)
+        except ValueError as exc:
+            return {"status": "ok", "consistent": False, "dimension": None, "message": str(exc)}
+        out: Dict[str, object] = {"status": "ok", "consistent": True, "dimension": format_dimension(d)}
+        if expected is not None and d != dimension_of(expected):
+            out["consistent"] = False
+            out["message"] = f"expected [{format_dimension(dimension_of(expected))}], got [{format_dimension(d)}]"
+        return out
+    except (ParseError, Exception) as exc:  # noqa: BLE001
+        return {"status": "error", "message": str(exc)}
+
+
+def scaling_check(
+    expr: Union[str, Basic],
+    units: Mapping[str, str],
+    samples: int = 1000,
+    seed: int = 0,
+    rtol: float = 1e-9,
+) -> Dict[str, object]:
+    """
+    Numeric dimensional-homogeneity check over sampled values. Each sample
+    draws input values and a random rescaling of the seven base units; a
+    dimensionally consistent expression must rescale exactly by its own
+    dimension. Evaluated in one vectorized pass.
+    Return: status, samples, passed (fraction of samples that rescale correctly).
+    """
+    try:
+        parsed = parse_expr(expr, symbols=units)
+        if isinstance(parsed, Equality):
+            parsed = parsed.lhs - parsed.rhs
+        symbols = sorted(parsed.free_symbols, key=lambda s: s.name)
+        dims = {Symbol(k): dimension_of(v) for k, v in units.items()}
+        out_dim = _expr_dim(parsed, dims)
+        if any(_expr_dim(a, dims) != DIMENSIONLESS for f in _UNIT_DEPENDENT for a in parsed.atoms(f)):
+            return {"status": "error", "message": "floor/ceiling of a dimensional quantity is not scale-invariant"}
+        rng = np.random.default_rng(seed)
+        scales = rng.uniform(0.5, 2.0, size=(samples, len(BASE_DIMENSIONS)))
+
+        def rescale(d: Dim) -> np.ndarray:
+            return np.prod(scales ** np.array([float(e) for e in d]), axis=1)
+
+        fn = lambdify(symbols, parsed, "numpy")
+        values = [rng.uniform(0.5, 2.0, size=samples) for _ in symbols]
+        base = np.asarray(fn(*values), dtype=float) * np.ones(samples)
+        scaled = np.asarray(
+            fn(*[v * rescale(dims.get(s, DIMENSIONLESS)) for v, s in zip(values, symbols)]), dtype=float
+        ) * np.ones(samples)
+        ok = np.isclose(scaled, base * rescale(out_dim), rtol=rtol, atol=0.0)
+        return {"status": "ok", "samples": samples, "passed": float(ok.mean())}
+    except (ParseError, Exception) as exc:  # noqa: BLE001
+        return {"status": "error", "message": str(exc)}